@@ -1,5 +1,5 @@
+import os
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from streamlit_searchbox import st_searchbox
 from data_service import TickerWrapper
@@ -7,7 +7,26 @@ import ticker_utils as tu
 from ui_logic import fmt
 
 st.set_page_config(page_title="Aktien Dashboard", layout="wide")
-service = TickerWrapper(ttl_minutes=3)
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+service = TickerWrapper(
+    ttl_minutes=3,
+    # Persistenter Cache unter data/cache: Warmstart nach Neustart ohne kompletten Download (benötigt pyarrow)
+    store_dir=os.path.join(DATA_DIR, "cache"),
+    max_cache_entries=500,
+    max_cache_bytes=256 * 1024 * 1024,
+    # Kompakte Kursdaten im Cache (float32), halbiert etwa den Speicherbedarf pro Ticker
+    compact_cache=True,
+    # Kursdaten als Sichten auf ein gemeinsames Panel je Börsenkalender: der Vergleichschart braucht kein Alignment
+    panel_store=True,
+    info_fields=("longName", "shortName", "currency"),
+    # Lokaler Symbol-Index für die Suche, lernt aus den Ergebnissen der Yahoo-Suche
+    symbol_index_path=os.path.join(DATA_DIR, "symbols.json"),
+    # Abgelaufene Kursdaten sofort anzeigen und im Hintergrund aktualisieren
+    stale_while_revalidate=True,
+    max_stale_minutes=30,
+    # Angezeigte Ticker im Hintergrund kurz vor Ablauf der TTL aktualisieren
+    background_refresh=True,
+)
 st.title("📈 Aktien Dashboard")
 
 if "tickers" not in st.session_state:
@@ -52,22 +71,34 @@ if not tickers:
     st.info("Bitte mindestens einen Ticker eingeben (z.B. AAPL, NVDA).")
     st.stop()
 
-@st.cache_data(ttl=60, show_spinner=False)
-def load_data_cached(tickers_tuple, period, use_dates, start_str, end_str):
-    if use_dates:
-        data = service.get_ticker_data_by_dates(tickers_tuple, start_str, end_str)
-    else:
-        data = service.get_ticker_data(tickers_tuple, period=period)
-
-    info = {t: service.get_info(t) for t in tickers_tuple}
-    news = {t: service.get_news(t, limit=10) for t in tickers_tuple}
-    return data, info, news
-
 start_str = start_date.strftime("%Y-%m-%d")
 end_str = end_date.strftime("%Y-%m-%d")
 
-with st.spinner("Lade Marktdaten…"):
-    data, info, news = load_data_cached(tickers, period, use_dates, start_str, end_str)
+# Ergebnisse kommen je Ticker, sobald sie da sind (Cache-Treffer zuerst):
+# bis alle geladen sind, zeigt eine Vorschau schon den Kursverlauf der fertigen Ticker
+data, info, news = {}, {}, {}
+progress = st.empty()
+preview = st.empty()
+results = service.iter_ticker_data(
+    tuple(tickers),
+    period=period,
+    start_date=start_str if use_dates else None,
+    end_date=end_str if use_dates else None,
+    limit=10,
+)
+for t, t_data, t_info, t_news in results:
+    data[t], info[t], news[t] = t_data, t_info, t_news
+    if len(data) < len(tickers):
+        progress.caption(f"Lade Marktdaten… ({len(data)}/{len(tickers)})")
+        ready = [k for k, v in data.items() if v is not None and not v.empty]
+        if ready:
+            preview_df = tu.build_comparison_frame(data, ready, percent=True)
+            preview.line_chart(tu.downsample_lttb(preview_df, max_points=1000), height=520, use_container_width=True)
+progress.empty()
+preview.empty()
+
+if not use_dates:
+    service.watch(list(tickers), period)
 
 available_tickers = [t for t in tickers if data.get(t) is not None and not data.get(t).empty]
 missing_tickers = [t for t in tickers if t not in available_tickers]
@@ -97,30 +128,14 @@ with left:
     # Option: absolut vs. % Entwicklung
     show_percent = st.toggle("Prozentuale Entwicklung anzeigen", value=True)
 
-    chart_df = pd.DataFrame()
-
-    for t in active:
-        df = data.get(t)
-        if df is None or df.empty or "Close" not in df.columns:
-            continue
-
-        s = df["Close"].dropna().rename(t)
-        chart_df = pd.concat([chart_df, s], axis=1)
+    # Basis je Aktie = erster verfügbarer Wert (nicht zwingend gleiche Kalenderzeile)
+    chart_df = tu.build_comparison_frame(data, active, percent=show_percent)
 
     if chart_df.empty:
         st.warning("Keine Close-Daten zum Plotten.")
     else:
-        chart_df = chart_df.sort_index()
-        chart_df = chart_df.dropna(how="all")
-
-        if show_percent:
-            # Basis je Aktie = erster verfügbarer Wert (nicht zwingend gleiche Kalenderzeile)
-            base = chart_df.apply(lambda col: col.dropna().iloc[0] if col.dropna().shape[0] else None)
-            chart_pct = (chart_df.divide(base) - 1.0) * 100.0
-            chart_pct = chart_pct.dropna(how="all")
-            st.line_chart(chart_pct, height=520, use_container_width=True)
-        else:
-            st.line_chart(chart_df, height=520, use_container_width=True)
+        # Das Chart ist höchstens ~1000 Pixel breit: mehr Punkte kosten nur Übertragung, ohne sichtbaren Unterschied
+        st.line_chart(tu.downsample_lttb(chart_df, max_points=1000), height=520, use_container_width=True)
 
     with st.expander("Rohdaten anzeigen"):
         st.dataframe(data[active[0]], use_container_width=True)
@@ -133,22 +148,18 @@ with right:
     df0 = data[t0]
     info0 = info.get(t0, {}) or {}
 
-    close = tu.get_latest_close(df0) if df0 is not None else None
-    interval_text = tu.get_interval_text(df0) if df0 is not None else "n/a"
+    # Kennzahlen werden einmal beim Laden berechnet und hier nur noch gelesen
+    summary = tu.get_summary(df0)
+    close = summary.latest_close if summary is not None else None
+    interval_text = summary.get_interval_text() if summary is not None else "n/a"
 
-    hi, hi_date = tu.get_high_market_price(df0) if df0 is not None else (None, None)
-    lo, lo_date = tu.get_low_market_price(df0) if df0 is not None else (None, None)
+    hi, hi_date = (summary.high, summary.high_date) if summary is not None else (None, None)
+    lo, lo_date = (summary.low, summary.low_date) if summary is not None else (None, None)
 
-    ytd = None
-    if df0 is not None and not df0.empty:
-        data_year = df0[df0.index.year == datetime.now().year]
-        if not data_year.empty:
-            start_open = data_year.iloc[0].get("Open", None)
-            try:
-                if start_open and float(start_open) != 0:
-                    ytd = ((float(close) - float(start_open)) / float(start_open)) * 100.0
-            except Exception:
-                ytd = None
+    # YTD immer aus Tagesdaten: Wochenbars beginnen erst am ersten Montag des Jahres,
+    # Intraday-Bars kurzer Perioden reichen nicht bis zum Jahresanfang zurück
+    ytd = service.get_year_performance(t0) if summary is not None else None
+    coarse_bars = not use_dates and tu.get_suitable_interval(period) in ("1wk", "1mo")
 
     currency = info0.get("currency", "")
 
@@ -156,12 +167,17 @@ with right:
     st.metric("Ticker", info0.get("longName", t0))
     st.metric("Kurs (Close)", f"{fmt(float(close) if close is not None else None)} {currency}".strip())
     st.caption(interval_text)
+    cache_age = df0.attrs.get("cache_age_seconds") if df0 is not None else None
+    if cache_age:
+        st.caption(f"Stand vor {int(cache_age // 60)} Min., Aktualisierung läuft…")
 
     st.markdown("---")
     st.write("**Intervall Hoch/Tief**")
     if hi is not None and lo is not None and hi_date is not None and lo_date is not None:
         st.write(f"• Hoch: {fmt(float(hi))} {currency} am {hi_date.strftime('%d.%m.%Y')}")
         st.write(f"• Tief: {fmt(float(lo))} {currency} am {lo_date.strftime('%d.%m.%Y')}")
+        if coarse_bars:
+            st.caption("Wochenwerte: Datum = Wochenbeginn, Hoch/Tief auf Basis der Wochenbars")
     else:
         st.write("• n/a")
 
@@ -177,7 +193,8 @@ with right:
         st.write("Keine News gefunden.")
     else:
         for item in news_items[:8]:
-            item = item["content"]
+            # yfinance verschachtelt neuere News in "content", RSS-Items sind flach
+            item = item.get("content") or item
             title = item.get("title") or "(ohne Titel)"
 
             # 🔧 FIX: beide Zeitstempel unterstützen
@@ -191,7 +208,7 @@ with right:
                     when = ""
 
             # 🔧 FIX: Link aus RSS oder yfinance
-            link = item.get("link") or item.get("url") or item.get("canonicalUrl").get("url") or item.get("clickThroughUrl").get("url") or ""
+            link = item.get("link") or item.get("url") or (item.get("canonicalUrl") or {}).get("url") or (item.get("clickThroughUrl") or {}).get("url") or ""
 
             if link:
                 st.markdown(
@@ -0,0 +1,188 @@
+import asyncio
+import feedparser
+import data_service as ds
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class AsyncTickerWrapper:
+    """
+    Asynchronous counterpart of TickerWrapper for async API servers. Shares the cache of the TickerWrapper
+    singleton. yfinance calls run in a bounded executor, search and RSS requests use non-blocking HTTP
+    if httpx is installed (and the executor otherwise), so one event loop can serve many concurrent clients.
+    """
+    def __init__(self, wrapper=None, max_workers=16, timeout=15):
+        """
+        Constructor for AsyncTickerWrapper
+
+        Parameters
+        ----------
+        wrapper : TickerWrapper, optional
+            The wrapper holding the cache. Default is the TickerWrapper singleton.
+        max_workers : int, optional
+            The maximum number of concurrent blocking calls. Default is 16.
+        timeout : float, optional
+            The timeout in seconds of the HTTP requests for search and RSS. Default is 15-seconds.
+        """
+        self.__wrapper = wrapper or ds.TickerWrapper()
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async-ticker-wrapper")
+        self.__timeout = timeout
+        self.__client = None
+
+    async def aclose(self):
+        """
+        Closes the HTTP client and shuts the executor down
+        """
+        if self.__client is not None:
+            await self.__client.aclose()
+            self.__client = None
+        self.__executor.shutdown(wait=False)
+
+    async def get_ticker_data(self, tickers, period="1y", interval=None):
+        """
+        Gets the stock data for the provided tickers in the provided period, see TickerWrapper.get_ticker_data
+
+        Parameters
+        ----------
+        tickers : str | list of str
+            The ticker symbols to get the data for
+        period : str, optional
+            The period to get the data for
+        interval : str, optional
+            The bar interval. Default is the suitable interval of the period
+        Returns
+        -------
+        dict[str, pd.DataFrame | None]
+            The stock data per ticker
+        """
+        return await self._run(self.__wrapper.get_ticker_data, tickers, period, interval)
+
+    async def get_ticker_data_by_dates(self, tickers, start_date, end_date, interval="1d"):
+        """
+        Gets the stock data for the provided tickers in the provided date range,
+        see TickerWrapper.get_ticker_data_by_dates
+
+        Parameters
+        ----------
+        tickers : str | list of str
+            The ticker symbols to get the data for
+        start_date : datetime.datetime
+            The start date of the range
+        end_date : datetime.datetime
+            The end date of the range
+        interval : str, optional
+            The bar interval. Default is 1-day
+        Returns
+        -------
+        dict[str, pd.DataFrame | None]
+            The stock data per ticker
+        """
+        return await self._run(self.__wrapper.get_ticker_data_by_dates, tickers, start_date, end_date, interval)
+
+    async def get_info(self, ticker):
+        """
+        Gets the info for the provided ticker, see TickerWrapper.get_info
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker symbol to get the info for
+        Returns
+        -------
+        dict
+            The info of the ticker
+        """
+        return await self._run(self.__wrapper.get_info, ticker)
+
+    async def get_company_name_and_symbol(self, search_term):
+        """
+        Searches for stock tickers and company names, see TickerWrapper.get_company_name_and_symbol
+
+        Parameters
+        ----------
+        search_term : str
+            The tickers or company names to look for
+        Returns
+        -------
+        list[tuple[str, dict]]
+            The found stock tickers and company names
+        """
+        local = self.__wrapper._search_local(search_term)
+        if local and self.__wrapper._has_local_match(search_term):
+            return local
+
+        try:
+            results = await self._search(search_term)
+        except Exception:
+            return local or {}
+
+        self.__wrapper._learn_symbols(results)
+        return ds._merge_search_results(results, local)
+
+    async def get_news(self, ticker, limit=10):
+        """
+        Gets the news for the provided ticker, see TickerWrapper.get_news.
+        The Google News fallback queries are requested concurrently.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker symbol to get the news for
+        limit : int, optional
+            The maximum number of news. Default is 10
+        Returns
+        -------
+        list[dict]
+            The news of the ticker
+        """
+        news = self.__wrapper._cached_news(ticker, limit)
+        if news is not None:
+            return news
+
+        news = await self._run(self.__wrapper._yahoo_news, ticker)
+        if not news:
+            queries = await self._run(self.__wrapper._news_queries, ticker)
+            feeds = await asyncio.gather(*(self._google_news(q, limit) for q in queries), return_exceptions=True)
+            news = ds._merge_news((items for items in feeds if isinstance(items, list)), limit)
+        return self.__wrapper._store_news(ticker, news, limit)
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, partial(function, *args))
+
+    def _get_client(self):
+        if self.__client is None:
+            self.__client = httpx.AsyncClient(headers=dict(ds._session.headers), timeout=self.__timeout)
+        return self.__client
+
+    async def _search(self, search_term):
+        if httpx is None:
+            return await self._run(ds.search_ticker, search_term)
+
+        term = (search_term or "").strip().lower()
+        if not term:
+            return []
+        cached = ds._search_from_cache(term)
+        if cached is not None:
+            return cached
+
+        response = await self._get_client().get(ds._SEARCH_URL, params=ds._search_params(term))
+        return ds._search_results(term, response.json())
+
+    async def _google_news(self, query, limit):
+        if httpx is None:
+            return await self._run(partial(ds._google_news_rss, query, limit=limit))
+
+        url = ds._google_news_url(query)
+        entries = ds._feed_cache.get(url)
+        if entries is None:
+            response = await self._get_client().get(url, headers=ds._feed_headers(url))
+            entries = feedparser.parse(response.content).entries if response.status_code == 200 else []
+            entries = ds._store_feed(url, response.status_code, response.headers.get("etag"),
+                                     response.headers.get("last-modified"), entries)
+        return ds._google_news_items(entries, limit)
@@ -2,19 +2,43 @@ import yfinance as yf
 import pandas as pd
 import feedparser
 import requests
+import threading
 import ticker_utils as tu
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed, wait
+from datetime import datetime, timedelta
+from functools import partial
 from urllib.parse import quote_plus
-from utils import Singleton, TickerCache
+from utils import MicroBatcher, NewsStore, PanelStore, Singleton, SingleFlight, TickerCache, TickerRefresher, TickerStore, TTLCache
+from symbol_index import SymbolIndex
 
 
-def _google_news_rss(query: str, lang="de", country="DE"):
+_NEWS_TIMEOUT = 5
+
+# yf.download collects its results in a module-global dict, concurrent calls overwrite each other's frames
+_download_lock = threading.Lock()
+
+# Intraday bars expire sooner and are dropped from memory sooner than daily bars, coarser bars later.
+# Intervals missing here use the ttl_minutes of the TickerWrapper and the retention of the TickerCache.
+_INTERVAL_TTL_MINUTES = {"5m": 1, "30m": 2, "1h": 3, "1wk": 30, "1mo": 60}
+_INTERVAL_RETENTION_MINUTES = {"5m": 15, "30m": 30, "1h": 60, "1wk": 24 * 60, "1mo": 24 * 60}
+
+# url -> parsed feed entries, refetched after the TTL with a conditional request (ETag/Last-Modified)
+_feed_cache = TTLCache(ttl_minutes=10, max_entries=256)
+# url -> (etag, modified, entries) of the last full response
+_feed_validators = TTLCache(ttl_minutes=24 * 60, max_entries=256)
+# Own pool, get_news itself may run on the TickerWrapper executor
+_feed_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="news-feed")
+
+
+def _google_news_url(query: str, lang="de", country="DE"):
     q = quote_plus(query)
-    url = f"https://news.google.com/rss/search?q={q}&hl={lang}-{country}&gl={country}&ceid={country}:{lang}"
-    feed = feedparser.parse(url)
+    return f"https://news.google.com/rss/search?q={q}&hl={lang}-{country}&gl={country}&ceid={country}:{lang}"
+
 
+def _google_news_items(entries, limit=20):
     items = []
-    for e in feed.entries[:20]:
+    for e in entries[:limit]:
         published = None
         if getattr(e, "published_parsed", None):
             published = datetime(*e.published_parsed[:6])
@@ -28,6 +52,89 @@ def _google_news_rss(query: str, lang="de", country="DE"):
     return items
 
 
+def _store_feed(url, status, etag, modified, entries):
+    # 304 Not Modified: the feed is unchanged, the previously parsed entries are served again
+    if status == 304:
+        validators = _feed_validators.get(url)
+        entries = validators[2] if validators is not None else []
+    elif status != 200:
+        # Failed fetch (network error without status, 4xx/5xx): not cached, the next call tries again
+        return entries
+    elif etag or modified:
+        _feed_validators.set(url, (etag, modified, entries))
+    _feed_cache.set(url, entries)
+    return entries
+
+
+def _feed_headers(url):
+    # Conditional request headers (ETag/Last-Modified) of the last full response
+    etag, modified, _ = _feed_validators.get(url) or (None, None, None)
+    return {key: value for key, value in (("If-None-Match", etag), ("If-Modified-Since", modified)) if value}
+
+
+def _google_news_rss(query: str, lang="de", country="DE", limit=20):
+    url = _google_news_url(query, lang, country)
+    entries = _feed_cache.get(url)
+    if entries is None:
+        # Fetched through the session with a timeout, a hung fetch must not keep a feed thread forever
+        try:
+            response = _session.get(url, headers=_feed_headers(url), timeout=_NEWS_TIMEOUT)
+        except requests.RequestException:
+            return []
+        entries = feedparser.parse(response.content).entries if response.status_code == 200 else []
+        entries = _store_feed(url, response.status_code, response.headers.get("etag"),
+                              response.headers.get("last-modified"), entries)
+    return _google_news_items(entries, limit)
+
+
+def _merge_news(feeds, limit):
+    results = []
+    seen = set()
+    for items in feeds:
+        for item in items:
+            key = (item.get("title"), item.get("link"))
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(item)
+            if len(results) >= limit:
+                return results
+    return results
+
+
+_SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+_SEARCH_QUOTES_COUNT = 10
+_SEARCH_TIMEOUT = 5
+
+# Keep-alive session shared by all searches, avoids a new TLS handshake per keystroke
+_session = requests.Session()
+_session.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# search term -> (results, complete); complete if Yahoo returned less quotes than requested
+_search_cache = TTLCache(ttl_minutes=60, max_entries=512)
+
+
+def _search_from_cache(term):
+    cached = _search_cache.get(term)
+    if cached is not None:
+        return cached[0]
+
+    # "appl" can be answered from the results of "app" if these were complete
+    for end in range(len(term) - 1, 0, -1):
+        cached = _search_cache.get(term[:end])
+        if cached is None:
+            continue
+        results, complete = cached
+        if not complete:
+            return None
+        return [
+            result for result in results
+            if term in (result[1]["symbol"] or "").lower() or term in (result[1]["name"] or "").lower()
+        ]
+    return None
+
+
 def search_ticker(search_term):
     """
     Search for stock tickers and company names
@@ -44,36 +151,53 @@ def search_ticker(search_term):
     if not search_term:
         return []
 
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-    url = "https://query2.finance.yahoo.com/v1/finance/search?"
-    params = {"q": search_term}
+    term = search_term.strip().lower()
+    if not term:
+        return []
+
+    cached = _search_from_cache(term)
+    if cached is not None:
+        return cached
+
+    response = _session.get(_SEARCH_URL, params=_search_params(term), timeout=_SEARCH_TIMEOUT)
+    return _search_results(term, response.json())
+
+
+def _search_params(term):
+    return {"q": term, "quotesCount": _SEARCH_QUOTES_COUNT, "newsCount": 0}
 
-    response = requests.get(url, params=params, headers=headers)
-    data = response.json()
 
+def _search_results(term, data):
     results = []
+    quotes = data.get('quotes') or []
 
-    if 'quotes' in data:
-        # EQUITY: Standard stocks or company shares (e.g., AAPL for Apple Inc.).
-        # ETF: Exchange-traded funds tracking indexes or sectors.
-        # MUTUAL FUND: Pooled investment funds (often mentioned alongside ETFs in lookups).
-        # OPTION: Derivatives contracts for buying/selling underlying assets.
-        # INDEX: Market benchmarks like S&P 500.
-        # FUTURE: Contracts for future asset delivery.
-        stocks = [item for item in data['quotes'] if item.get('quoteType') == 'EQUITY']
-
-        for stock in stocks:
-            symbol = stock.get('symbol')
-            name = stock.get('longname') or stock.get('shortname')
-            results.append(
-                (
-                    f"{name} ({symbol})",
-                    {"name": name, "symbol": symbol}
-                )
+    # EQUITY: Standard stocks or company shares (e.g., AAPL for Apple Inc.).
+    # ETF: Exchange-traded funds tracking indexes or sectors.
+    # MUTUAL FUND: Pooled investment funds (often mentioned alongside ETFs in lookups).
+    # OPTION: Derivatives contracts for buying/selling underlying assets.
+    # INDEX: Market benchmarks like S&P 500.
+    # FUTURE: Contracts for future asset delivery.
+    stocks = [item for item in quotes if item.get('quoteType') == 'EQUITY']
+
+    for stock in stocks:
+        symbol = stock.get('symbol')
+        name = stock.get('longname') or stock.get('shortname')
+        results.append(
+            (
+                f"{name} ({symbol})",
+                {"name": name, "symbol": symbol}
             )
+        )
 
+    _search_cache.set(term, (results, len(quotes) < _SEARCH_QUOTES_COUNT))
     return results
 
+
+def _merge_search_results(remote, local):
+    symbols = {record.get("symbol") for _, record in remote or []}
+    return [*(remote or []), *(result for result in local if result[1].get("symbol") not in symbols)]
+
+
 def _normalize_history_frame(fetched: pd.DataFrame, ticker: str) -> pd.DataFrame | None:
     if fetched is None or fetched.empty:
         return None
@@ -98,12 +222,44 @@ def _normalize_history_frame(fetched: pd.DataFrame, ticker: str) -> pd.DataFrame
     return df if not df.empty else None
 
 
+def _future_result(future, default):
+    if not future.done():
+        future.cancel()
+        return default
+    try:
+        return future.result()
+    except Exception:
+        return default
+
+
+def _iter_result(future, ticker, position, default):
+    # The data future answers all tickers at once with a dict, the others answer one ticker
+    result = _future_result(future, default)
+    return result.get(ticker) if position == 0 else result
+
+
+def _with_age(data, age):
+    if isinstance(data, pd.DataFrame):
+        data = data.copy(deep=False)
+        data.attrs["cache_age_seconds"] = age.total_seconds()
+    return data
+
+
+def _has_frame(entry) -> bool:
+    return entry is not None and isinstance(entry.data, pd.DataFrame) and not entry.data.empty
+
+
 class TickerWrapper(Singleton):
     """
     Main data provider for ticker symbols. Caches data to improve access speed.
     Implemented as Singleton.
     """
-    def __init__(self, ttl_minutes=3):
+    def __init__(self, ttl_minutes=3, delta_refresh=True, delta_overlap_days=2, store_dir=None,
+                 max_cache_entries=None, max_cache_bytes=None, max_workers=8, info_ttl_minutes=60, info_fields=None,
+                 symbol_index_path=None, batch_window_ms=None, stale_while_revalidate=False,
+                 max_stale_minutes=60, background_refresh=False, refresh_lead_seconds=30, news_ttl_minutes=5,
+                 max_news=50, compact_cache=False, panel_store=False, interval_ttl_minutes=None,
+                 interval_retention_minutes=None):
         """
         Constructor for TickerWrapper
 
@@ -111,10 +267,159 @@ class TickerWrapper(Singleton):
         ----------
         ttl_minutes : int, optional
             The time to live for the cache in minutes. Default is 3-minutes.
+        delta_refresh : bool, optional
+            If True, expired cache entries are refreshed by downloading only the bars
+            after the last cached bar. Default is True.
+        delta_overlap_days : int, optional
+            The number of days before the last cached bar that are downloaded again
+            on a delta refresh to pick up revised values. Default is 2-days.
+        store_dir : str, optional
+            The directory of the persistent cache tier. If None, data is only cached in memory.
+        max_cache_entries : int, optional
+            The maximum number of tickers kept in memory. Default is unbounded.
+        max_cache_bytes : int, optional
+            The maximum memory usage of the cached data in bytes. Default is unbounded.
+        max_workers : int, optional
+            The maximum number of concurrent network calls of the fan-out methods. Default is 8.
+        info_ttl_minutes : int, optional
+            The time to live for cached ticker infos in minutes. Default is 60-minutes.
+        info_fields : list of str, optional
+            The info fields to keep in the cache. If None, the whole info is kept.
+        symbol_index_path : str, optional
+            The JSON file of the local symbol index searched before the remote search.
+            If None, every search goes to the remote search.
+        batch_window_ms : int, optional
+            If set, downloads requested by concurrent callers within this window (e.g. 50 ms) are merged
+            into one yf.download per range. If None, every caller downloads immediately.
+        stale_while_revalidate : bool, optional
+            If True, expired cache entries are returned immediately (with their age in seconds in
+            DataFrame.attrs["cache_age_seconds"]) and refreshed in the background. Default is False.
+        max_stale_minutes : int, optional
+            The maximum age in minutes of an entry returned while revalidating. Older entries are
+            refreshed before returning. Default is 60-minutes.
+        background_refresh : bool, optional
+            If True, tickers passed to watch are refreshed by a background thread shortly before their
+            cache entries expire, during trading hours. Default is False.
+        refresh_lead_seconds : int, optional
+            The time in seconds before the expiry at which the background thread refreshes an entry.
+            Default is 30-seconds.
+        news_ttl_minutes : int, optional
+            The time in minutes after which the news of a ticker are refreshed. Default is 5-minutes.
+        max_news : int, optional
+            The maximum number of news kept per ticker. Default is 50.
+        compact_cache : bool, optional
+            If True, cached frames are kept with float32 prices (float64 where float32 cannot hold the cents),
+            narrowed Volume and shared indices, which about halves their memory usage. Default is False.
+        panel_store : bool, optional
+            If True, returned frames are read-only views into a PanelStore (one index per exchange calendar,
+            one tickers × dates array per field), so frames of the same calendar share their index and
+            cross-ticker operations need no realignment. Default is False.
+        interval_ttl_minutes : dict[str, int], optional
+            The time to live in minutes per bar interval, overriding the defaults (e.g. 1-minute for 5m bars).
+            Intervals without a time to live use ttl_minutes.
+        interval_retention_minutes : dict[str, int], optional
+            The time in minutes expired entries are kept for delta refreshes per bar interval,
+            overriding the defaults.
         """
-        self.__ticker_cache = TickerCache(ttl_minutes)
+        # Singleton: __init__ runs on every TickerWrapper() call, the cache must survive it
+        if getattr(self, "_TickerWrapper__initialized", False):
+            return
+        self.__initialized = True
+        store = TickerStore(store_dir) if store_dir else None
+        self.__panel = PanelStore() if panel_store else None
+        self.__ticker_cache = TickerCache(
+            ttl_minutes, store=store, max_entries=max_cache_entries, max_bytes=max_cache_bytes,
+            compact=compact_cache, interval_ttl_minutes={**_INTERVAL_TTL_MINUTES, **(interval_ttl_minutes or {})},
+            interval_retention_minutes={**_INTERVAL_RETENTION_MINUTES, **(interval_retention_minutes or {})},
+            # Panel rows leave together with their cache entries, so the panel is bounded like the cache
+            on_remove=self.__panel.discard if self.__panel is not None else None)
+        self.__delta_refresh = delta_refresh
+        self.__delta_overlap = timedelta(days=delta_overlap_days)
+        self.__stale_while_revalidate = stale_while_revalidate
+        self.__max_stale = timedelta(minutes=max_stale_minutes)
+        self.__in_flight = SingleFlight()
+        self.__batcher = MicroBatcher(batch_window_ms / 1000, self._fetch) if batch_window_ms else None
+        self.__info_cache = TTLCache(info_ttl_minutes)
+        self.__info_fields = tuple(info_fields) if info_fields else None
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ticker-wrapper")
+        self.__refresh_lead = timedelta(seconds=refresh_lead_seconds)
+        self.__refresher = None
+        if background_refresh:
+            self.__refresher = TickerRefresher(self.refresh_tickers)
+            self.__refresher.start()
+        self.__news_store = NewsStore(news_ttl_minutes, max_news)
+        self.__symbol_index = None
+        if symbol_index_path:
+            self.__symbol_index = SymbolIndex(symbol_index_path)
+            self.__symbol_index.refresh_async()
 
-    def get_ticker_data(self, tickers: str | list[str], period="1y"):
+    def get_cache_stats(self):
+        """
+        Gets the counters of the ticker data cache
+
+        Returns
+        -------
+        dict[str, int]
+            The number of entries, their memory usage and the hit, miss, eviction and expiration counters
+        """
+        return self.__ticker_cache.stats()
+
+    def watch(self, tickers, period="1y"):
+        """
+        Marks the provided tickers as requested by a session, so the background refresh keeps them warm
+
+        Parameters
+        ----------
+        tickers : str | list of str
+            The ticker symbols to watch
+        period : str, optional
+            The period the tickers are shown for. Default is 1-year
+        """
+        if self.__refresher is None:
+            return
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        period = tu.get_next_suitable_period(period) or "1y"
+        self.__refresher.watch([t.strip().upper() for t in tickers if t.strip()], period)
+
+    def refresh_tickers(self, tickers, period="1y", now=None, interval=None):
+        """
+        Refreshes the provided tickers whose cache entries expire within the refresh lead time.
+        Tickers without cache entry are downloaded completely.
+
+        Parameters
+        ----------
+        tickers : list of str
+            The ticker symbols to refresh
+        period : str, optional
+            The period the tickers are shown for. Default is 1-year
+        now : datetime.datetime, optional
+            The time of the refresh
+        interval : str, optional
+            The bar interval. Default is the suitable interval of the period
+        Returns
+        -------
+        list[str]
+            The refreshed tickers
+        """
+        now = now or datetime.now()
+        interval = interval or tu.get_suitable_interval(period)
+        ttl = self.__ticker_cache.get_ttl(interval)
+        expiring = {}
+        missing = []
+        for t in tickers:
+            entry = self.__ticker_cache.get_entry(t, interval)
+            if not _has_frame(entry):
+                missing.append(t)
+            elif not entry.is_valid(now + self.__refresh_lead, ttl) or not entry.is_current():
+                expiring[t] = entry
+        if expiring:
+            self._refresh_tail(expiring, now, interval)
+        if missing:
+            self.get_ticker_data(missing, period, interval)
+        return [*expiring, *missing]
+
+    def get_ticker_data(self, tickers: str | list[str], period="1y", interval=None):
         """
         Gets the stock data for the provided tickers for the provided period
 
@@ -124,10 +429,18 @@ class TickerWrapper(Singleton):
             The ticker symbols to get data for
         period: str, optional
             The period to get the data for. Default is 1-year
+        interval : str, optional
+            The bar interval, e.g. 5m, 1h, 1d or 1wk. Default is the suitable interval of the period
+            (e.g. 5m for 1-day, 1d for 1-year), see ticker_utils.get_suitable_interval. Bars of a coarser interval
+            are derived from cached bars of a finer interval covering the period instead of being downloaded.
         Returns
         -------
         dict[str, Any | None]
             The stock data for the provided tickers
+        Raises
+        ------
+        ValueError
+            If the period exceeds the lookback limit of an intraday interval
         """
         if not tickers:
             return {}
@@ -140,31 +453,236 @@ class TickerWrapper(Singleton):
             return {}
 
         period = tu.get_next_suitable_period(period) or "1y"
+        interval = interval or tu.get_suitable_interval(period)
+        tu.get_next_suitable_period(period, interval)
 
         now = datetime.now()
-        data = {t: self.__ticker_cache.get(t, period, now) for t in tickers}
+        data = {t: self.__ticker_cache.get(t, period, now, interval) for t in tickers}
         missing = [key for key, value in data.items() if value is None]
 
+        min_date = tu.get_min_date_in_period_from_now(period, now)
+
+        stale = {}
+        partial_entries = {}
+        for t in missing:
+            entry = self.__ticker_cache.get_partial(t, period, now, interval)
+            if _has_frame(entry):
+                partial_entries[t] = entry
+            elif self.__delta_refresh:
+                entry = self.__ticker_cache.get_stale(t, period, now, interval)
+                if _has_frame(entry):
+                    stale[t] = entry
+        missing = [t for t in missing if t not in stale and t not in partial_entries]
+
+        if self.__stale_while_revalidate:
+            revalidate = {t: entry for t, entry in stale.items()
+                          if entry.is_current() and now - entry.timestamp < self.__max_stale}
+            for t, entry in revalidate.items():
+                data[t] = _with_age(entry.slice(tu.get_period_start(entry.data, period, now)), now - entry.timestamp)
+                stale.pop(t)
+            self._revalidate(revalidate, interval)
+
         if missing:
+            updated = self._download(missing, period=period, interval=interval)
+            if updated:
+                data.update(updated)
+                self.__ticker_cache.set_tickers(updated, period, interval)
+
+        if stale:
+            refreshed = self._refresh_tail(stale, now, interval)
+            data.update({t: tu.slice_history_frame(df, tu.get_period_start(df, period, now))
+                         for t, df in refreshed.items()})
+
+        if partial_entries:
+            data.update(self._extend_head(partial_entries, min_date, interval))
+
+        # Compact cache entries are served with their original dtypes.
+        # The key figures are attached once here, so the UI reads them in O(1) (no-op for cached slices)
+        data = {t: tu.restore_history_frame(frame) for t, frame in data.items()}
+        for frame in data.values():
+            tu.get_summary(frame)
+        return self._to_panel(data)
+
+    def _download(self, tickers, **kwargs):
+        """
+        Downloads the stock data for the provided tickers with one yf.download call, or together with the
+        tickers of other callers if a batch window is configured. Tickers already being downloaded with the
+        same arguments by another caller are not downloaded again, their result is awaited instead.
+
+        Parameters
+        ----------
+        tickers : list of str
+            The ticker symbols to download
+        kwargs
+            The range and interval arguments passed to yf.download (period or start/end)
+        Returns
+        -------
+        dict[str, pd.DataFrame | None]
+            The normalized stock data per ticker. Tickers whose download failed are missing.
+        """
+        request = tuple(sorted(kwargs.items()))
+        owned, pending = self.__in_flight.claim([(t, request) for t in tickers])
+
+        result = {}
+        if owned:
             try:
-                fetched = yf.download(
-                    missing,
-                    period=period,
-                    group_by="ticker",
-                    rounding=True,
-                    progress=False,
-                    auto_adjust=False,
-                )
+                if self.__batcher is not None:
+                    futures = self.__batcher.submit(request, [t for t, _ in owned])
+                    for t, future in futures.items():
+                        result[t] = future.result()
+                else:
+                    result.update(self._fetch(request, [t for t, _ in owned]))
             except Exception:
-                return data
+                pass
+            finally:
+                for key in owned:
+                    if key[0] in result:
+                        self.__in_flight.resolve(key, result[key[0]])
+                    else:
+                        self.__in_flight.resolve(key, error=RuntimeError(f"Download of {key[0]} failed"))
 
-            updated = {t: _normalize_history_frame(fetched, t) for t in missing}
-            data.update(updated)
-            self.__ticker_cache.set_tickers(updated, period)
+        for (t, _), future in pending.items():
+            try:
+                result[t] = future.result()
+            except Exception:
+                pass
+        return result
 
-        return data
+    def _fetch(self, request, tickers):
+        """
+        Downloads the stock data for the provided tickers with one yf.download call
 
-    def get_ticker_data_by_dates(self, tickers, start_date, end_date):
+        Parameters
+        ----------
+        request : tuple
+            The range arguments passed to yf.download as sorted (name, value) pairs
+        tickers : list of str
+            The ticker symbols to download
+        Returns
+        -------
+        dict[str, pd.DataFrame | None]
+            The normalized stock data per ticker
+        """
+        with _download_lock:
+            fetched = yf.download(
+                tickers,
+                group_by="ticker",
+                rounding=True,
+                progress=False,
+                auto_adjust=False,
+                # Naive timestamps for intraday bars as well, the cache compares them with naive datetimes
+                ignore_tz=True,
+                **dict(request),
+            )
+        return {t: _normalize_history_frame(fetched, t) for t in tickers}
+
+    def _revalidate(self, stale, interval="1d"):
+        """
+        Refreshes the provided expired cache entries in the background.
+        Entries already being refreshed are skipped.
+
+        Parameters
+        ----------
+        stale : dict[str, CacheEntry]
+            The expired cache entries per ticker
+        interval : str, optional
+            The bar interval of the entries. Default is 1-day
+        """
+        owned, _ = self.__in_flight.claim([("revalidate", t, interval) for t in stale])
+        if not owned:
+            return
+
+        def _refresh():
+            try:
+                self._refresh_tail({t: stale[t] for _, t, _ in owned}, datetime.now(), interval)
+            finally:
+                for key in owned:
+                    self.__in_flight.resolve(key)
+
+        self.__executor.submit(_refresh)
+
+    def _refresh_tail(self, stale, now, interval="1d"):
+        """
+        Refreshes expired cache entries by downloading only the bars after their last cached bar
+        (plus the configured overlap) and merging them into the cached data
+
+        Parameters
+        ----------
+        stale : dict[str, CacheEntry]
+            The expired cache entries per ticker
+        now : datetime.datetime
+            The time of the refresh
+        interval : str, optional
+            The bar interval of the entries. Default is 1-day
+        Returns
+        -------
+        dict[str, pd.DataFrame]
+            The refreshed stock data per ticker
+        """
+        groups = {}
+        for t, entry in stale.items():
+            start = (entry.data.index.max() - self.__delta_overlap).strftime("%Y-%m-%d")
+            groups.setdefault(start, []).append(t)
+
+        result = {}
+        for start, group in groups.items():
+            fetched = self._download(group, start=start, interval=interval)
+            for t in group:
+                entry = stale[t]
+                delta = fetched.get(t)
+                if delta is None:
+                    # Keep serving the old data, the next call tries again
+                    result[t] = entry.data
+                    continue
+                merged = tu.merge_history_frames(entry.data, delta)
+                self.__ticker_cache.set_ticker(t, merged, entry.min_date, now, interval=interval)
+                result[t] = merged
+        return result
+
+    def _extend_head(self, partial_entries, min_date, interval="1d"):
+        """
+        Extends valid cache entries that cover only the most recent part of a period
+        by downloading only the missing older range and merging it into the cached data
+
+        Parameters
+        ----------
+        partial_entries : dict[str, CacheEntry]
+            The partial cache entries per ticker
+        min_date : datetime.datetime
+            The minimum date the entries have to cover
+        interval : str, optional
+            The bar interval of the entries. Default is 1-day
+        Returns
+        -------
+        dict[str, pd.DataFrame | None]
+            The extended stock data per ticker
+        """
+        start = min_date.strftime("%Y-%m-%d")
+        groups = {}
+        for t, entry in partial_entries.items():
+            # yf.download excludes the end date, so the first cached bar is downloaded again as overlap
+            end = (entry.data.index.min() + timedelta(days=1)).strftime("%Y-%m-%d")
+            groups.setdefault(end, []).append(t)
+
+        result = {}
+        for end, group in groups.items():
+            fetched = self._download(group, start=start, end=end, interval=interval)
+            for t in group:
+                entry = partial_entries[t]
+                head = fetched.get(t)
+                if head is None:
+                    if t in fetched:
+                        # Nothing older available (e.g. recent IPO), remember that the range is covered
+                        self.__ticker_cache.set_ticker(t, entry.data, min_date, entry.timestamp, interval=interval)
+                    result[t] = entry.data
+                    continue
+                merged = tu.merge_history_frames(entry.data, head)
+                # The tail was not refreshed, so the entry keeps its fetch time
+                self.__ticker_cache.set_ticker(t, merged, min_date, entry.timestamp, interval=interval)
+                result[t] = merged
+        return result
+
+    def get_ticker_data_by_dates(self, tickers, start_date, end_date, interval="1d"):
         """
         Gets the stock data for the provided tickers in the provided period
 
@@ -176,6 +694,8 @@ class TickerWrapper(Singleton):
             The start date to get the data for
         end_date: datetime
             The end date to get the data for
+        interval : str, optional
+            The bar interval. Default is 1-day
         Returns
         -------
         dict[str, Any | None] | None
@@ -187,64 +707,358 @@ class TickerWrapper(Singleton):
         if not tickers:
             return {}
 
-        try:
-            fetched = yf.download(
-                tickers,
-                start=start_date,
-                end=end_date,
-                group_by="ticker",
-                rounding=True,
-                progress=False,
-                auto_adjust=False,
-            )
-        except Exception:
-            return {}
+        start = pd.Timestamp(start_date).to_pydatetime()
+        end = pd.Timestamp(end_date).to_pydatetime()
+        now = datetime.now()
+        data = {t: self.__ticker_cache.get_range(t, start, end, now, interval) for t in tickers}
+        missing = [key for key, value in data.items() if value is None]
+        if not missing:
+            return self._to_panel(data)
 
-        return {t: _normalize_history_frame(fetched, t) for t in tickers}
+        # Only the gaps before and after the cached data are downloaded. Tickers with the same gap share one
+        # download and every gap touches the cached data, so the result merges into one contiguous entry.
+        # Ranges far from the cached data are downloaded on their own and not cached, bridging the distance
+        # would download every bar in between.
+        gap_requests = {}
+        gaps = {}
+        entries = {t: self.__ticker_cache.get_entry(t, interval) for t in missing}
+        ttl = self.__ticker_cache.get_ttl(interval)
+        for t in missing:
+            entry = entries[t]
+            if not _has_frame(entry):
+                gaps[t] = [("full", (start, end))]
+            elif end < entry.min_date or (entry.max_date is not None and start > entry.max_date):
+                gaps[t] = [("detached", (start, end))]
+            else:
+                gaps[t] = []
+                if start < entry.min_date:
+                    gaps[t].append(("head", (start, entry.data.index.min() + timedelta(days=1))))
+                if not entry.covers_range(entry.min_date, end, now, ttl):
+                    gaps[t].append(("tail", (entry.data.index.max() - self.__delta_overlap, end)))
+            for _, key in gaps[t]:
+                gap_requests.setdefault(key, []).append(t)
+
+        fetched = {
+            key: self._download(group, start=key[0].strftime("%Y-%m-%d"), end=key[1].strftime("%Y-%m-%d"),
+                                interval=interval)
+            for key, group in gap_requests.items()
+        }
+
+        max_date = end if end < now else None
+        for t in missing:
+            entry = entries[t]
+            if gaps[t][0][0] in ("full", "detached"):
+                frame = fetched[(start, end)].get(t)
+                if frame is not None and gaps[t][0][0] == "full":
+                    self.__ticker_cache.set_ticker(t, frame, start, now, max_date, interval)
+                data[t] = frame
+                continue
+
+            merged, min_date, timestamp, entry_max_date = entry.data, entry.min_date, entry.timestamp, entry.max_date
+            for kind, key in gaps[t]:
+                if t not in fetched[key]:
+                    continue
+                if kind == "head":
+                    # Remember the range as covered even if nothing older exists (e.g. recent IPO)
+                    min_date = start
+                else:
+                    timestamp, entry_max_date = now, max_date
+                merged = tu.merge_history_frames(merged, fetched[key].get(t))
+            if merged is not entry.data or min_date != entry.min_date:
+                self.__ticker_cache.set_ticker(t, merged, min_date, timestamp, entry_max_date, interval)
+            data[t] = tu.slice_history_frame(merged, start, end)
+
+        data = {t: tu.restore_history_frame(frame) for t, frame in data.items()}
+        for frame in data.values():
+            tu.get_summary(frame)
+        return self._to_panel(data)
 
     def get_info(self, ticker):
+        """
+        Gets the info for the provided ticker. Infos are cached, optionally reduced to the configured fields.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker symbol to get the info for
+        Returns
+        -------
+        dict
+            The info of the ticker
+        """
+        info = self.__info_cache.get(ticker)
+        if info is not None:
+            return info
+
         try:
-            return yf.Ticker(ticker).info or {}
+            info = self.__in_flight.do(("info", ticker), lambda: yf.Ticker(ticker).info or {})
         except Exception:
             return {}
 
+        if self.__info_fields:
+            info = {key: info[key] for key in self.__info_fields if key in info}
+        if info:
+            self.__info_cache.set(ticker, info)
+        return info
+
+    def get_info_and_news(self, tickers, limit=10, timeout=15):
+        """
+        Gets the info and the news for the provided tickers concurrently.
+        All calls run in parallel (bounded by max_workers), calls that did not finish
+        within the timeout are answered with empty results.
+
+        Parameters
+        ----------
+        tickers : str | list of str
+            The ticker symbols to get the info and news for
+        limit : int, optional
+            The maximum number of news per ticker. Default is 10
+        timeout : float, optional
+            The maximum time in seconds to wait for the calls. Default is 15-seconds
+        Returns
+        -------
+        tuple[dict[str, dict], dict[str, list]]
+            The info and the news per ticker
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        info_futures = {t: self.__executor.submit(self.get_info, t) for t in tickers}
+        news_futures = {t: self.__executor.submit(self.get_news, t, limit) for t in tickers}
+        wait([*info_futures.values(), *news_futures.values()], timeout=timeout)
+
+        info = {t: _future_result(f, {}) for t, f in info_futures.items()}
+        news = {t: _future_result(f, []) for t, f in news_futures.items()}
+        return info, news
+
+    def iter_ticker_data(self, tickers, period="1y", start_date=None, end_date=None, limit=10, interval=None,
+                         timeout=15):
+        """
+        Yields the stock data, info and news per ticker as soon as they are available. Tickers answered
+        completely from the caches come first, the others follow in the order their calls complete.
+        Info and news are loaded per ticker, so one slow ticker does not hold back the others. The missing
+        stock data is loaded with one download for all tickers.
+        Calls that did not finish within the timeout are answered with empty results.
+
+        Parameters
+        ----------
+        tickers : str | list of str
+            The ticker symbols to get the data for
+        period : str, optional
+            The period to get the data for. Default is 1-year. Ignored if start_date and end_date are set.
+        start_date : datetime, optional
+            The start date to get the data for, see get_ticker_data_by_dates
+        end_date : datetime, optional
+            The end date to get the data for, see get_ticker_data_by_dates
+        limit : int, optional
+            The maximum number of news per ticker. Default is 10
+        interval : str, optional
+            The bar interval. Default is the suitable interval of the period, or 1-day for a date range
+        timeout : float, optional
+            The maximum time in seconds to wait for the calls. Default is 15-seconds
+        Yields
+        ------
+        tuple[str, pd.DataFrame | None, dict, list]
+            The ticker, its stock data, info and news
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+
+        now = datetime.now()
+        if start_date is not None and end_date is not None:
+            start = pd.Timestamp(start_date).to_pydatetime()
+            end = pd.Timestamp(end_date).to_pydatetime()
+            interval = interval or "1d"
+            cached_data = partial(self.__ticker_cache.get_range, start=start, end=end, now=now, interval=interval)
+        else:
+            period = tu.get_next_suitable_period(period) or "1y"
+            interval = interval or tu.get_suitable_interval(period)
+            tu.get_next_suitable_period(period, interval)
+            cached_data = partial(self.__ticker_cache.get, period=period, now=now, interval=interval)
+        load_data = partial(self._load_ticker_data, period=period, start_date=start_date, end_date=end_date,
+                            interval=interval)
+
+        defaults = ({}, {}, [])
+        results = {}
+        # future -> (ticker, position) pairs answered by it
+        futures = {}
+        missing_data = []
+        for t in tickers:
+            result = [self._to_panel({t: cached_data(t)})[t], self.__info_cache.get(t), self._cached_news(t, limit)]
+            if all(value is not None for value in result):
+                tu.get_summary(result[0])
+                yield t, *result
+                continue
+            results[t] = result
+            if result[0] is None:
+                missing_data.append(t)
+            for position, function in ((1, self.get_info), (2, partial(self.get_news, limit=limit))):
+                if result[position] is None:
+                    futures[self.__executor.submit(function, t)] = [(t, position)]
+        if missing_data:
+            # One download for all tickers like get_ticker_data, instead of one yf.download per ticker
+            futures[self.__executor.submit(load_data, missing_data)] = [(t, 0) for t in missing_data]
+
+        pending = {t: sum(1 for keys in futures.values() for key in keys if key[0] == t) for t in results}
+        done = set()
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                done.add(future)
+                for t, position in futures[future]:
+                    results[t][position] = _iter_result(future, t, position, defaults[position])
+                    pending[t] -= 1
+                    if not pending[t]:
+                        yield t, *results.pop(t)
+        except TimeoutError:
+            # Hung calls (e.g. yfinance or RSS) must not block the page, their tickers get the defaults
+            for future, keys in futures.items():
+                if future not in done:
+                    for t, position in keys:
+                        results[t][position] = _iter_result(future, t, position, defaults[position])
+            for t, result in results.items():
+                yield t, *result
+
+    def _load_ticker_data(self, tickers, period, start_date, end_date, interval):
+        if start_date is not None and end_date is not None:
+            return self.get_ticker_data_by_dates(tickers, start_date, end_date, interval)
+        return self.get_ticker_data(tickers, period=period, interval=interval)
+
     def get_company_name_and_symbol(self, search_term):
+        """
+        Searches for stock tickers and company names. The local symbol index is asked first and answers alone
+        if it has an exact symbol or name match. Otherwise, the remote search runs as well and its results come
+        first, followed by the local matches it did not return. Remote results are added to the local index.
+
+        Parameters
+        ----------
+        search_term : str
+            The tickers or company names to look for
+        Returns
+        -------
+        list[tuple[str, dict]]
+            The found stock tickers and company names
+        """
+        local = self._search_local(search_term)
+        if local and self._has_local_match(search_term):
+            return local
+
         try:
-            return search_ticker(search_term)
+            results = search_ticker(search_term)
         except Exception:
-            return {}
+            return local or {}
+
+        self._learn_symbols(results)
+        return _merge_search_results(results, local)
+
+    def _search_local(self, search_term):
+        if self.__symbol_index is None:
+            return []
+        return self.__symbol_index.search(search_term)
+
+    def _has_local_match(self, search_term):
+        return self.__symbol_index is not None and self.__symbol_index.has_exact_match(search_term)
+
+    def _learn_symbols(self, results):
+        if self.__symbol_index is not None and results:
+            self.__symbol_index.add([record for _, record in results])
+            self.__executor.submit(self.__symbol_index.save)
 
     def get_news(self, ticker, limit=10):
+        """
+        Gets the newest news for the provided ticker. News are kept per ticker and refreshed after
+        news_ttl_minutes from yfinance, or from Google News RSS if yfinance has none.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker symbol to get the news for
+        limit : int, optional
+            The maximum number of news. Default is 10
+        Returns
+        -------
+        list[dict]
+            The news of the ticker, newest first
+        """
+        news = self._cached_news(ticker, limit)
+        if news is not None:
+            return news
+
         # 1) yfinance zuerst
-        try:
-            news = yf.Ticker(ticker).news or []
-            if news:
-                return news[:limit]
-        except Exception:
-            pass
+        news = self._yahoo_news(ticker)
+        if not news:
+            # 2) Fallback: Google News RSS (Company + Ticker), alle Queries parallel
+            futures = [_feed_executor.submit(_google_news_rss, q, lang="de", country="DE", limit=limit)
+                       for q in self._news_queries(ticker)]
+            wait(futures, timeout=_NEWS_TIMEOUT)
+            news = _merge_news((_future_result(f, []) for f in futures), limit)
+        return self._store_news(ticker, news, limit)
+
+    def get_year_performance(self, ticker, now=None):
+        """
+        Gets the performance of the provided ticker since the first open of the current year in percent.
+        It is computed from daily bars, so it does not depend on the interval shown: weekly bars start on the
+        first Monday of the year and intraday bars of a short period do not reach back to the year start.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker symbol to get the performance for
+        now : datetime.datetime, optional
+            The time defining the current year
+        Returns
+        -------
+        float | None
+            The performance in percent or None if there are no daily bars of the current year
+        """
+        summary = tu.get_summary(self.get_ticker_data([ticker], period="ytd", interval="1d").get(ticker.upper()))
+        if summary is None or summary.year != (now or datetime.now()).year:
+            return None
+        return summary.get_year_performance()
+
+    def get_panel_frame(self, tickers, field="Close"):
+        """
+        Gets the provided field of the provided tickers, aligned on their calendars, from the panel store
+
+        Parameters
+        ----------
+        tickers : list of str
+            The tickers to get the field for, in column order
+        field : str, optional
+            The field to get. Default is Close
+        Returns
+        -------
+        pd.DataFrame | None
+            The field values with the tickers as columns. None if the panel store is disabled
+        """
+        if self.__panel is None:
+            return None
+        return self.__panel.frame(tickers, field)
 
-        # 2) Fallback: Google News RSS (Company + Ticker)
+    def _to_panel(self, data):
+        if self.__panel is None:
+            return data
+        return {t: self.__panel.set(t, frame) for t, frame in data.items()}
+
+    def _cached_news(self, ticker, limit):
+        return self.__news_store.get(ticker, limit)
+
+    def _store_news(self, ticker, news, limit):
+        self.__news_store.merge(ticker, news)
+        return self.__news_store.get(ticker, limit) or []
+
+    def _yahoo_news(self, ticker):
         try:
-            info = yf.Ticker(ticker).info or {}
-            company = (info.get("shortName") or info.get("longName") or "").strip()
+            return yf.Ticker(ticker).news or []
         except Exception:
-            company = ""
+            return []
+
+    def _news_queries(self, ticker):
+        info = self.get_info(ticker)
+        company = (info.get("shortName") or info.get("longName") or "").strip()
 
         queries = []
         if company:
             queries.append(f"{company} stock")
         queries.append(f"{ticker} stock")
-
-        results = []
-        seen = set()
-        for q in queries:
-            for item in _google_news_rss(q, lang="de", country="DE"):
-                key = (item.get("title"), item.get("link"))
-                if key in seen:
-                    continue
-                seen.add(key)
-                results.append(item)
-                if len(results) >= limit:
-                    return results[:limit]
-
-        return results[:limit]
\ No newline at end of file
+        return queries
@@ -0,0 +1,195 @@
+import os
+import re
+import json
+import tempfile
+import threading
+from bisect import bisect_left
+
+
+__compiled_separator_pattern = re.compile('[^a-z0-9]+')
+
+
+def _normalize(text):
+    return __compiled_separator_pattern.sub(' ', (text or '').lower()).strip()
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    """
+    Local symbol/name index for instant ticker search without network round trips.
+    Prefix matches are answered from a sorted key list, fuzzy matches from a trigram inverted index.
+    The index is stored as JSON file and learns the results of remote searches.
+    """
+    def __init__(self, path=None, min_similarity=0.5):
+        """
+        Constructor for SymbolIndex
+
+        Parameters
+        ----------
+        path : str, optional
+            The JSON file to load the index from and to save it to. If None, the index is kept in memory only.
+            The file is read by load or refresh_async.
+        min_similarity : float, optional
+            The minimum share of the search term's trigrams a fuzzy match has to contain. Default is 0.5
+        """
+        self.path = path
+        self.min_similarity = min_similarity
+        self.__lock = threading.Lock()
+        self.__records = {}
+        self.__snapshot = ({}, [], {}, frozenset())
+        self.__dirty = False
+
+    def __len__(self):
+        return len(self.__records)
+
+    def add(self, records):
+        """
+        Adds the provided records to the index
+
+        Parameters
+        ----------
+        records : list of dict
+            The records with the keys symbol and name
+        """
+        with self.__lock:
+            records = {**self.__records, **{r['symbol']: r.get('name') for r in records if r.get('symbol')}}
+            if records != self.__records:
+                self.__build(records)
+                self.__dirty = True
+
+    def search(self, search_term, limit=10):
+        """
+        Searches the index for symbols and company names matching the provided search_term.
+        Prefix matches of the symbol or of a word in the name come first, followed by fuzzy matches.
+
+        Parameters
+        ----------
+        search_term : str
+            The ticker or company name to look for
+        limit : int, optional
+            The maximum number of results. Default is 10
+        Returns
+        -------
+        list[tuple[str, dict]]
+            The found stock tickers and company names in the format of data_service.search_ticker
+        """
+        term = _normalize(search_term)
+        if not term:
+            return []
+        records, keys, grams, _ = self.__snapshot
+
+        found = []
+        position = bisect_left(keys, (term, ''))
+        while position < len(keys) and keys[position][0].startswith(term) and len(found) < limit:
+            symbol = keys[position][1]
+            if symbol not in found:
+                found.append(symbol)
+            position += 1
+
+        if len(found) < limit and len(term) >= 3:
+            term_grams = _trigrams(term)
+            counts = {}
+            for gram in term_grams:
+                for symbol in grams.get(gram, ()):
+                    counts[symbol] = counts.get(symbol, 0) + 1
+            ranked = sorted(
+                (symbol for symbol, count in counts.items()
+                 if count / len(term_grams) >= self.min_similarity and symbol not in found),
+                key=lambda symbol: (-counts[symbol], symbol),
+            )
+            found.extend(ranked[:limit - len(found)])
+
+        return [(f"{records[symbol]} ({symbol})", {"name": records[symbol], "symbol": symbol}) for symbol in found]
+
+    def has_exact_match(self, search_term):
+        """
+        Checks if the provided search_term is a symbol or a whole company name in the index. Only then the index
+        is sure to hold what is looked for, words of names, prefixes and fuzzy matches may also match
+        companies the index has not learned yet.
+
+        Parameters
+        ----------
+        search_term : str
+            The ticker or company name to look for
+        Returns
+        -------
+        bool
+            True if the index has an exact match
+        """
+        return _normalize(search_term) in self.__snapshot[3]
+
+    def load(self):
+        """
+        Loads the index from its JSON file
+        """
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                records = {r['symbol']: r.get('name') for r in json.load(file) if r.get('symbol')}
+        except (OSError, ValueError):
+            return
+        with self.__lock:
+            self.__build({**records, **self.__records})
+
+    def save(self):
+        """
+        Saves the index to its JSON file if it changed since the last save
+        """
+        if not self.path or not self.__dirty:
+            return
+        with self.__lock:
+            records = [{"symbol": symbol, "name": name} for symbol, name in self.__records.items()]
+            self.__dirty = False
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Own temporary file per save, saves of concurrent searches may overlap
+        handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(self.path) or '.')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as file:
+                json.dump(records, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def refresh_async(self):
+        """
+        Merges the symbols in the JSON file (e.g. learned by other processes sharing the file) into the index
+        and saves the symbols learned here in a background thread
+
+        Returns
+        -------
+        threading.Thread
+            The started thread
+        """
+        def _refresh():
+            self.load()
+            try:
+                self.save()
+            except OSError:
+                pass
+
+        thread = threading.Thread(target=_refresh, name='symbol-index-refresh', daemon=True)
+        thread.start()
+        return thread
+
+    def __build(self, records):
+        keys = []
+        grams = {}
+        exact = set()
+        for symbol, name in records.items():
+            exact.update(word for word in (_normalize(symbol), _normalize(name)) if word)
+            words = {_normalize(symbol), _normalize(name)}
+            words.update(_normalize(name).split())
+            keys.extend((word, symbol) for word in words if word)
+            for gram in _trigrams(_normalize(symbol)) | _trigrams(_normalize(name)):
+                grams.setdefault(gram, set()).add(symbol)
+        keys.sort()
+        self.__records = records
+        # Swap all structures at once, searches running concurrently keep their consistent snapshot
+        self.__snapshot = (records, keys, grams, frozenset(exact))
@@ -1,10 +1,58 @@
 import re
+import logging
+import threading
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from datetime import timedelta
+from functools import lru_cache
 from dateutil.relativedelta import relativedelta
 
 
+logger = logging.getLogger(__name__)
+
 __compiled_period_pattern = re.compile('^([1-9][0-9]*)(d|mo|y)$')
+__comparison_cache = OrderedDict()
+__comparison_cache_size = 32
+# Streamlit runs every session in its own thread, all of them share the memo
+__comparison_cache_lock = threading.Lock()
+# Offsets of the suitable periods, subtracted from the start of the current day
+__period_offsets = {
+    '1d': timedelta(days=1), '5d': timedelta(days=5),
+    '1mo': relativedelta(months=1), '3mo': relativedelta(months=3), '6mo': relativedelta(months=6),
+    '1y': relativedelta(years=1), '2y': relativedelta(years=2), '5y': relativedelta(years=5),
+    '10y': relativedelta(years=10), 'ytd': relativedelta(month=1, day=1),
+}
+# Bar interval per suitable period: enough points for short periods, few bars for long ones
+__period_intervals = {
+    '1d': '5m', '5d': '30m', '1mo': '1h', '3mo': '1d', '6mo': '1d', '1y': '1d', '2y': '1d', 'ytd': '1d',
+    '5y': '1wk', '10y': '1wk',
+}
+# Maximum length in days of the suitable periods
+__period_days = {
+    '1d': 1, '5d': 5, '1mo': 31, '3mo': 92, '6mo': 184, '1y': 366, '2y': 731, '5y': 1827, '10y': 3653, 'ytd': 366,
+}
+# Number of trading sessions of the day-based periods, like the period argument of yf.download
+__period_sessions = {'1d': 1, '5d': 5}
+# Maximum lookback in days of the intraday intervals offered by Yahoo Finance
+__interval_max_days = {'1m': 7, '2m': 60, '5m': 60, '15m': 60, '30m': 60, '90m': 60, '60m': 730, '1h': 730}
+__ohlcv_aggregation = {
+    'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Adj Close': 'last', 'Volume': 'sum'
+}
+# Length in minutes of the bar intervals offered by Yahoo Finance
+__interval_minutes = {
+    '1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '90m': 90, '1h': 60, '1d': 1440, '5d': 7200,
+    '1wk': 10080, '1mo': 43200, '3mo': 129600,
+}
+# pandas resample rule per interval that can be derived from finer bars, labelled by the bar start like Yahoo.
+# Intraday bars are counted from the session open instead (e.g. 09:30, 10:30, ... for 1h), see resample_history_frame
+__resample_rules = {
+    '2m': '2min', '5m': '5min', '15m': '15min', '30m': '30min', '60m': '60min', '90m': '90min', '1h': '60min',
+    '1d': 'D', '1wk': 'W-MON', '1mo': 'MS', '3mo': 'QS',
+}
+# Intervals with another name for the same bars, not offered as additional source
+__interval_aliases = {'60m': '1h'}
+
 
 def get_latest_close(ticker_data: pd.DataFrame):
     """Gets the latest Close value from the provided ticker_data
@@ -111,8 +159,527 @@ def get_low_market_price(ticker_data: pd.DataFrame):
     return ticker_data.loc[low_market_price_date]['Low'], low_market_price_date
 
 
+class TickerSummary:
+    """
+    Key figures of a ticker frame (latest close, interval high/low with their dates, first open of the year
+    and date span). Computed once per frame and extended incrementally when new bars are appended.
+    """
+    def __init__(self, start_date, end_date, rows, latest_close, high, high_date, low, low_date, year, year_open):
+        """
+        Constructor for TickerSummary
+
+        Parameters
+        ----------
+        start_date : pd.Timestamp
+            The date of the first bar
+        end_date : pd.Timestamp
+            The date of the last bar
+        rows : int
+            The number of bars
+        latest_close : object
+            The latest Close value
+        high : object | None
+            The highest High value
+        high_date : pd.Timestamp | None
+            The date of the highest High value
+        low : object | None
+            The lowest Low value
+        low_date : pd.Timestamp | None
+            The date of the lowest Low value
+        year : int
+            The year of the last bar
+        year_open : object | None
+            The Open value of the first bar in year
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.rows = rows
+        self.latest_close = latest_close
+        self.high = high
+        self.high_date = high_date
+        self.low = low
+        self.low_date = low_date
+        self.year = year
+        self.year_open = year_open
+
+    def matches(self, ticker_data: pd.DataFrame):
+        """
+        Checks if the summary was computed for the provided ticker_data
+
+        Parameters
+        ----------
+        ticker_data : DataFrame
+            The DataFrame to check
+        Returns
+        -------
+        bool
+            True if the date span, the number of bars and the latest close (within float32 precision) are the same
+        """
+        if len(ticker_data) != self.rows or ticker_data.index[0] != self.start_date \
+                or ticker_data.index[-1] != self.end_date:
+            return False
+        latest_close = _column_value(ticker_data, 'Close', -1)
+        # Tolerates the float32 precision of compact frames (see compact_history_frame)
+        if latest_close is None or self.latest_close is None:
+            return latest_close is self.latest_close
+        return bool(np.isclose(latest_close, self.latest_close, rtol=1e-6))
+
+    def get_interval_text(self):
+        """
+        Gets a string representation of the start and end date, see get_interval_text
+
+        Returns
+        -------
+        str
+            The string representation of the start and end dates
+        """
+        return f'vom {self.start_date.strftime("%d.%m.%Y")} bis {self.end_date.strftime("%d.%m.%Y")}'
+
+    def get_year_performance(self):
+        """
+        Gets the change of the latest close relative to the first open of the year in percent
+
+        Returns
+        -------
+        float | None
+            The performance in percent or None if there is no usable open value
+        """
+        try:
+            if self.year_open and float(self.year_open) != 0:
+                return (float(self.latest_close) - float(self.year_open)) / float(self.year_open) * 100.0
+        except (TypeError, ValueError):
+            pass
+        return None
+
+
+def _column_value(ticker_data: pd.DataFrame, column, position):
+    return ticker_data[column].iloc[position] if column in ticker_data.columns else None
+
+
+def _column_extreme(ticker_data: pd.DataFrame, column, highest):
+    if column not in ticker_data.columns:
+        return None, None
+    values = ticker_data[column].to_numpy(dtype=float)
+    if np.isnan(values).all():
+        return None, None
+    position = int(np.nanargmax(values) if highest else np.nanargmin(values))
+    return ticker_data[column].iloc[position], ticker_data.index[position]
+
+
+def _year_open(ticker_data: pd.DataFrame):
+    year = ticker_data.index[-1].year
+    position = ticker_data.index.searchsorted(ticker_data.index[-1].replace(month=1, day=1, hour=0, minute=0,
+                                                                             second=0, microsecond=0))
+    return year, _column_value(ticker_data, 'Open', position)
+
+
+def summarize_history_frame(ticker_data: pd.DataFrame):
+    """Computes the TickerSummary of the provided ticker_data
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The sorted DataFrame holding the information
+    Returns
+    -------
+    TickerSummary | None
+        The summary or None if ticker_data is no DataFrame or empty
+    """
+    if not isinstance(ticker_data, pd.DataFrame) or ticker_data.empty:
+        return None
+    high, high_date = _column_extreme(ticker_data, 'High', True)
+    low, low_date = _column_extreme(ticker_data, 'Low', False)
+    year, year_open = _year_open(ticker_data)
+    return TickerSummary(ticker_data.index[0], ticker_data.index[-1], len(ticker_data),
+                         _column_value(ticker_data, 'Close', -1), high, high_date, low, low_date, year, year_open)
+
+
+def get_summary(ticker_data: pd.DataFrame):
+    """Gets the TickerSummary of the provided ticker_data. The summary is kept in DataFrame.attrs["summary"],
+    so repeated calls for the same frame are O(1)
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The sorted DataFrame holding the information
+    Returns
+    -------
+    TickerSummary | None
+        The summary or None if ticker_data is no DataFrame or empty
+    """
+    if not isinstance(ticker_data, pd.DataFrame) or ticker_data.empty:
+        return None
+    summary = ticker_data.attrs.get('summary')
+    if not isinstance(summary, TickerSummary) or not summary.matches(ticker_data):
+        summary = summarize_history_frame(ticker_data)
+        ticker_data.attrs['summary'] = summary
+    return summary
+
+
+def _extend_summary(summary: TickerSummary, merged: pd.DataFrame, update: pd.DataFrame):
+    start = update.index[0]
+    # A replaced extreme may have been lowered/raised by the update, only then all bars have to be scanned again
+    if (summary.high_date is not None and summary.high_date >= start) or \
+            (summary.low_date is not None and summary.low_date >= start):
+        return summarize_history_frame(merged)
+    high, high_date = _column_extreme(update, 'High', True)
+    low, low_date = _column_extreme(update, 'Low', False)
+    if high is None or (summary.high is not None and summary.high >= high):
+        high, high_date = summary.high, summary.high_date
+    if low is None or (summary.low is not None and summary.low <= low):
+        low, low_date = summary.low, summary.low_date
+    year, year_open = _year_open(merged)
+    return TickerSummary(merged.index[0], merged.index[-1], len(merged),
+                         _column_value(merged, 'Close', -1), high, high_date, low, low_date, year, year_open)
+
+
+def build_comparison_frame(ticker_data: dict, tickers, percent=False):
+    """Builds one DataFrame with the Close values of the provided tickers as columns, aligned on a common index.
+    In percent mode every column is the change in percent relative to its first available value.
+    Results are memoised per tickers, date range and mode
+
+    Parameters
+    ----------
+    ticker_data : dict[str, DataFrame]
+        The DataFrames holding the information per ticker
+    tickers : list of str
+        The tickers to compare, in column order
+    percent : bool, optional
+        If True, the percentage change is returned instead of the absolute values. Default is False
+    Returns
+    -------
+    DataFrame
+        The aligned Close values or percentage changes
+    """
+    series = {}
+    for ticker in tickers:
+        df = ticker_data.get(ticker)
+        if isinstance(df, pd.DataFrame) and not df.empty and 'Close' in df.columns:
+            series[ticker] = df['Close']
+    if not series:
+        return pd.DataFrame()
+
+    key = (percent, tuple((t, s.index[0], s.index[-1], len(s), s.iloc[-1]) for t, s in series.items()))
+    with __comparison_cache_lock:
+        cached = __comparison_cache.get(key)
+        if cached is not None:
+            __comparison_cache.move_to_end(key)
+            return cached
+
+    indices = [column.index for column in series.values()]
+    if all(index is indices[0] for index in indices[1:]):
+        # Frames sharing one calendar index (see utils.PanelStore) are aligned already
+        values = np.column_stack([column.to_numpy(dtype=float) for column in series.values()])
+        frame = pd.DataFrame(values, index=indices[0], columns=list(series)).dropna(how='all')
+    else:
+        # Aligns all series in one pass instead of concatenating them one by one
+        frame = pd.concat(series, axis=1).sort_index().dropna(how='all')
+    if percent:
+        values = frame.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        # Base per column = first available value (not necessarily in the same row for all tickers)
+        base = values[valid.argmax(axis=0), np.arange(values.shape[1])]
+        base[~valid.any(axis=0)] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frame = pd.DataFrame((values / base - 1.0) * 100.0, index=frame.index, columns=frame.columns)
+        frame = frame.dropna(how='all')
+
+    with __comparison_cache_lock:
+        __comparison_cache[key] = frame
+        while len(__comparison_cache) > __comparison_cache_size:
+            __comparison_cache.popitem(last=False)
+    return frame
+
+
+def _lttb_indices(x, y, max_points):
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    # First and last point are always kept, the points in between are split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Keeps the point spanning the largest triangle with the previous point and the next bucket's average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_lttb(ticker_data: pd.DataFrame, max_points=1000):
+    """Reduces the rows of the provided ticker_data to about max_points rows using the
+    Largest-Triangle-Three-Buckets algorithm, which keeps the visual shape of line charts.
+    Every column is downsampled on its own, the result holds the union of the kept rows
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The sorted DataFrame holding the line values per column
+    max_points : int, optional
+        The point budget for the whole chart. Default is 1000
+    Returns
+    -------
+    DataFrame
+        The downsampled DataFrame
+    """
+    if not isinstance(ticker_data, pd.DataFrame) or len(ticker_data) <= max_points:
+        return ticker_data
+    if isinstance(ticker_data.index, pd.DatetimeIndex):
+        x_all = ticker_data.index.asi8.astype(float)
+    else:
+        x_all = np.arange(len(ticker_data), dtype=float)
+
+    per_column = max(3, max_points // max(1, ticker_data.shape[1]))
+    keep = np.zeros(len(ticker_data), dtype=bool)
+    for column in ticker_data.columns:
+        y_all = ticker_data[column].to_numpy(dtype=float)
+        positions = np.flatnonzero(~np.isnan(y_all))
+        keep[positions[_lttb_indices(x_all[positions], y_all[positions], per_column)]] = True
+    return ticker_data.iloc[np.flatnonzero(keep)]
+
+
+def downsample_ohlc(ticker_data: pd.DataFrame, max_points=1000):
+    """Aggregates the rows of the provided ticker_data into max_points buckets of consecutive rows
+    (first Open, highest High, lowest Low, last Close, summed Volume) for candlestick charts
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The sorted DataFrame holding the OHLCV information
+    max_points : int, optional
+        The maximum number of buckets. Default is 1000
+    Returns
+    -------
+    DataFrame
+        The aggregated DataFrame, indexed by the first date of each bucket
+    """
+    if not isinstance(ticker_data, pd.DataFrame) or len(ticker_data) <= max_points:
+        return ticker_data
+    buckets = np.arange(len(ticker_data)) * max_points // len(ticker_data)
+    aggregation = {column: rule for column, rule in __ohlcv_aggregation.items() if column in ticker_data.columns}
+    result = ticker_data.groupby(buckets).agg(aggregation)
+    result.index = ticker_data.index[np.searchsorted(buckets, result.index)]
+    return result
+
+
+@lru_cache(maxsize=32)
+def get_resample_sources(interval):
+    """Gets the finer intervals the bars of the provided interval can be derived from, the finest first.
+    Bars up to one day are derived from intervals dividing them, longer bars from bars up to one day.
+
+    Parameters
+    ----------
+    interval : str
+        The interval to derive, e.g. 1wk
+    Returns
+    -------
+    tuple[str, ...]
+        The source intervals. Empty if the interval cannot be derived
+    """
+    minutes = __interval_minutes.get(interval)
+    if interval not in __resample_rules or minutes is None:
+        return ()
+    day = __interval_minutes['1d']
+    sources = [
+        source for source, source_minutes in __interval_minutes.items()
+        if source not in __interval_aliases and source_minutes < minutes and (minutes % source_minutes == 0 if minutes <= day else source_minutes <= day)
+    ]
+    return tuple(sorted(sources, key=__interval_minutes.get))
+
+
+def resample_history_frame(ticker_data: pd.DataFrame, interval):
+    """Aggregates the rows of the provided ticker_data into bars of the provided interval
+    (first Open, highest High, lowest Low, last Close, summed Volume). Bars are labelled with their start
+    (weeks start on Monday, months on the first day), periods without rows are left out. Intraday bars are
+    counted from the first row of each day like the bars of Yahoo Finance (e.g. 09:30, 10:30, ... for 1h).
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The sorted DataFrame holding the OHLCV information with a DatetimeIndex
+    interval : str
+        The interval of the bars, e.g. 1h, 1d, 1wk or 1mo
+    Returns
+    -------
+    DataFrame | object
+        The aggregated DataFrame. Anything else than a DataFrame is returned unchanged
+    """
+    if not isinstance(ticker_data, pd.DataFrame) or ticker_data.empty:
+        return ticker_data
+    rule = __resample_rules.get(interval)
+    if rule is None:
+        raise ValueError('Invalid input')
+    aggregation = {column: how for column, how in __ohlcv_aggregation.items() if column in ticker_data.columns}
+    if __interval_minutes[interval] < __interval_minutes['1d']:
+        index = ticker_data.index
+        session_open = index.to_series().groupby(index.normalize()).transform('first')
+        step = pd.Timedelta(rule)
+        starts = pd.DatetimeIndex(session_open + (index - session_open) // step * step, name=index.name)
+        result = ticker_data.groupby(starts).agg(aggregation)
+    else:
+        result = ticker_data.resample(rule, closed='left', label='left').agg(aggregation)
+    prices = [column for column in result.columns if column != 'Volume']
+    return result.dropna(how='all', subset=prices) if prices else result
+
+
+def compact_history_frame(ticker_data: pd.DataFrame, calendars=None, decimals=2):
+    """Converts the provided ticker_data to a compact representation: float32 prices, the smallest integer type
+    holding the Volume and, if calendars is provided, an index object shared by all frames with the same dates.
+    Price columns whose values rounded to decimals cannot be restored from float32 (e.g. cents of prices above
+    about 131k) stay float64
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The DataFrame holding the information
+    calendars : MutableMapping, optional
+        The known indices, e.g. a weakref.WeakValueDictionary shared by all compacted frames
+    decimals : int, optional
+        The number of decimals of the prices restored by restore_history_frame. Default is 2
+    Returns
+    -------
+    DataFrame | object
+        The compact DataFrame. Anything else than a DataFrame is returned unchanged
+    """
+    if not isinstance(ticker_data, pd.DataFrame) or ticker_data.empty:
+        return ticker_data
+    columns = {}
+    for column, values in ticker_data.items():
+        if pd.api.types.is_float_dtype(values.dtype):
+            narrowed = values.to_numpy(dtype=np.float32)
+            if np.array_equal(narrowed.astype(np.float64).round(decimals),
+                              values.to_numpy(dtype=np.float64).round(decimals), equal_nan=True):
+                values = pd.Series(narrowed, index=values.index)
+        elif pd.api.types.is_integer_dtype(values.dtype):
+            values = pd.to_numeric(values, downcast='integer')
+        columns[column] = values.to_numpy()
+
+    index = ticker_data.index
+    if calendars is not None:
+        key = (len(index), index[0], index[-1])
+        shared = calendars.get(key)
+        if shared is not None and shared.equals(index):
+            index = shared
+        else:
+            calendars[key] = index
+    compact = pd.DataFrame(columns, index=index, copy=False)
+    compact.attrs = dict(ticker_data.attrs)
+    return compact
+
+
+def restore_history_frame(ticker_data: pd.DataFrame, decimals=2):
+    """Restores the dtypes of a frame converted by compact_history_frame: float64 prices rounded to the provided
+    decimals (the precision of yf.download(rounding=True)) and int64 Volume
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The compact DataFrame
+    decimals : int, optional
+        The number of decimals of the prices. Default is 2
+    Returns
+    -------
+    DataFrame | object
+        The restored DataFrame. Frames without narrowed columns and anything else than a DataFrame
+        are returned unchanged
+    """
+    if not isinstance(ticker_data, pd.DataFrame):
+        return ticker_data
+    floats = [column for column, dtype in ticker_data.dtypes.items() if dtype == np.float32]
+    integers = [column for column, dtype in ticker_data.dtypes.items()
+                if pd.api.types.is_integer_dtype(dtype) and dtype != np.int64]
+    if not floats and not integers:
+        return ticker_data
+    restored = ticker_data.astype({**{c: np.float64 for c in floats}, **{c: np.int64 for c in integers}})
+    if floats:
+        restored[floats] = restored[floats].round(decimals)
+    return restored
+
+
+def merge_history_frames(base: pd.DataFrame, update: pd.DataFrame):
+    """Merges the rows of update into base. Rows of update replace the rows of base
+    within the date range covered by update, all other rows of base are kept
+
+    Parameters
+    ----------
+    base : DataFrame
+        The sorted DataFrame holding the existing information
+    update : DataFrame
+        The sorted DataFrame holding the new information
+    Returns
+    -------
+    DataFrame | None
+        The merged DataFrame. If only bars were appended to base, its summary is extended (see get_summary)
+    """
+    if not isinstance(base, pd.DataFrame) or base.empty:
+        return update
+    if not isinstance(update, pd.DataFrame) or update.empty:
+        return base
+    head = base.iloc[:base.index.searchsorted(update.index.min(), side='left')]
+    tail = base.iloc[base.index.searchsorted(update.index.max(), side='right'):]
+    if head.empty and tail.empty:
+        return update
+    merged = pd.concat([head, update, tail])
+    summary = base.attrs.get('summary')
+    if tail.empty and isinstance(summary, TickerSummary) and summary.matches(base):
+        # Only bars were appended, the summary of base is extended instead of scanning all bars again
+        merged.attrs['summary'] = _extend_summary(summary, merged, update)
+    return merged
+
+
+def slice_history_frame(ticker_data: pd.DataFrame, min_date, max_date=None):
+    """Gets the rows of the provided ticker_data between min_date and max_date without copying the data
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The sorted DataFrame holding the information
+    min_date : datetime.datetime | None
+        The minimum date of the returned rows
+    max_date : datetime.datetime | None, optional
+        The exclusive maximum date of the returned rows. Default is no limit
+    Returns
+    -------
+    DataFrame | object
+        The rows between min_date and max_date. Anything else than a DataFrame is returned unchanged
+    """
+    if not isinstance(ticker_data, pd.DataFrame) or ticker_data.empty:
+        return ticker_data
+    start = ticker_data.index.searchsorted(min_date, side='left') if min_date is not None else 0
+    end = ticker_data.index.searchsorted(max_date, side='left') if max_date is not None else len(ticker_data)
+    return ticker_data.iloc[start:end]
+
+
+def is_trading_time(now, open_hour=8, close_hour=22):
+    """Checks if the provided now is within the trading hours, i.e. on a weekday
+    between open_hour and close_hour (local time, the default covers European and US exchanges)
+
+    Parameters
+    ----------
+    now : datetime.datetime
+        The time to check
+    open_hour : int, optional
+        The hour the first exchange opens. Default is 8
+    close_hour : int, optional
+        The hour the last exchange closes. Default is 22
+    Returns
+    -------
+    bool
+        True if the provided now is within the trading hours
+    """
+    return now.weekday() < 5 and open_hour <= now.hour < close_hour
+
+
 def get_min_date_in_period_from_now(period, now):
-    """Calculates the datetime resulting from the provided now and period parameters
+    """Calculates the datetime resulting from the provided now and period parameters.
+    Results are memoised per period and day, so repeated calls need no parsing or date arithmetic
 
     Parameters
     ----------
@@ -125,34 +692,85 @@ def get_min_date_in_period_from_now(period, now):
     datetime.datetime | None
         The calculated datetime
     """
-    period = get_next_suitable_period(period)
-    print(f'found period: {period}')
-    match period:
-        case '1d': return (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case '5d': return (now - timedelta(days=5)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case '1mo': return (now - relativedelta(months=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case '3mo': return (now - relativedelta(months=3)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case '6mo': return (now - relativedelta(months=6)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case '1y': return (now - relativedelta(years=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case '2y': return (now - relativedelta(years=2)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case '5y': return (now - relativedelta(years=5)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case '10y': return (now - relativedelta(years=10)).replace(hour=0, minute=0, second=0, microsecond=0)
-        case 'ytd': return (now - relativedelta(month=1, day=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-    return None
+    return _get_min_date_in_period(period, now.replace(hour=0, minute=0, second=0, microsecond=0))
+
+
+def get_period_start(ticker_data, period, now):
+    """Calculates the minimum date of the provided period for slicing the provided ticker_data.
+    The period is counted back from the last bar if it is older than now (weekends, holidays, before the open),
+    so the period always ends with the last trading session instead of coming back empty or short.
+    Day-based periods (1d, 5d) are counted in trading sessions of the data like a download of the period,
+    e.g. 1d starts at the date of the last bar
+
+    Parameters
+    ----------
+    ticker_data : DataFrame
+        The sorted DataFrame holding the information
+    period : str
+        The period to calculate
+    now : datetime.datetime
+        The base datetime to calculate the period for
+    Returns
+    -------
+    datetime.datetime | None
+        The calculated datetime
+    """
+    if isinstance(ticker_data, pd.DataFrame) and not ticker_data.empty:
+        sessions = __period_sessions.get(get_next_suitable_period(period))
+        if sessions is not None and isinstance(ticker_data.index, pd.DatetimeIndex):
+            days = np.unique(ticker_data.index.values.astype('datetime64[D]'))
+            return pd.Timestamp(days[max(len(days) - sessions, 0)]).to_pydatetime()
+        now = min(now, pd.Timestamp(ticker_data.index[-1]).to_pydatetime())
+    return get_min_date_in_period_from_now(period, now)
+
+
+@lru_cache(maxsize=256)
+def _get_min_date_in_period(period, day):
+    suitable_period = get_next_suitable_period(period)
+    logger.debug('found period %s for %s', suitable_period, period)
+    offset = __period_offsets.get(suitable_period)
+    return day - offset if offset is not None else None
+
 
+def get_suitable_interval(period):
+    """Gets the bar interval to download for the provided period
 
-def get_next_suitable_period(period_input):
+    Parameters
+    ----------
+    period : str
+        The period to get the interval for
+    Returns
+    -------
+    str
+        The interval, e.g. 5m for 1d or 1wk for 5y. Default is 1d
+    """
+    return __period_intervals.get(get_next_suitable_period(period), '1d')
+
+
+@lru_cache(maxsize=64)
+def get_next_suitable_period(period_input, interval=None):
     """Calculates the next suitable period for the given period_input
 
     Parameters
     ----------
     period_input : str
         The period_input to calculate the period for
+    interval : str, optional
+        The bar interval the period is requested with. Intraday intervals are only available
+        for a limited lookback, longer periods raise a ValueError
     Returns
     -------
     str | None
         The calculated period
     """
+    period = _get_next_suitable_period(period_input)
+    max_days = __interval_max_days.get(interval)
+    if max_days is not None and (period is None or __period_days[period] > max_days):
+        raise ValueError('Invalid input')
+    return period
+
+
+def _get_next_suitable_period(period_input):
     # 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max
     if not period_input or period_input == 'max':
         return None
@@ -1,6 +1,24 @@
+import os
+import json
+import tempfile
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from datetime import datetime, timedelta
+from itertools import islice
+from urllib.parse import quote
 import ticker_utils as tu
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # optional dependency, the persistent store stays disabled without it
+    pa = None
+    feather = None
+
 class Singleton:
     """
     Base class for the Singleton pattern.
@@ -12,18 +30,940 @@ class Singleton:
             cls.__instance = super().__new__(cls)
         return cls.__instance
 
+
+class TTLCache:
+    """
+    Simple key-value cache with a time to live and an optional maximum number of entries (least recently used
+    entries are evicted first)
+    """
+    def __init__(self, ttl_minutes=60, max_entries=None):
+        """
+        Constructor for TTLCache
+
+        Parameters
+        ----------
+        ttl_minutes : float, optional
+            The time to live of the entries in minutes. Default is 60-minutes.
+        max_entries : int, optional
+            The maximum number of entries. Default is unbounded.
+        """
+        self.cache = OrderedDict()
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.max_entries = max_entries
+        self.__lock = threading.Lock()
+
+    def get(self, key, now=None):
+        """
+        Gets the value for the provided key if still valid
+
+        Parameters
+        ----------
+        key : Hashable
+            The key to get the value for
+        now : datetime.datetime, optional
+            The time to check the time to live against
+        Returns
+        -------
+        object | None
+            The cached value
+        """
+        now = now or datetime.now()
+        with self.__lock:
+            item = self.cache.get(key)
+            if item is None:
+                return None
+            value, timestamp = item
+            if now - timestamp >= self.ttl:
+                self.cache.pop(key, None)
+                return None
+            self.cache.move_to_end(key)
+            return value
+
+    def set(self, key, value, now=None):
+        """
+        Sets the value for the provided key
+
+        Parameters
+        ----------
+        key : Hashable
+            The key to set the value for
+        value : object
+            The value to cache
+        now : datetime.datetime, optional
+            The time when the value was fetched
+        """
+        with self.__lock:
+            self.cache[key] = (value, now or datetime.now())
+            self.cache.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self.cache) > self.max_entries:
+                    self.cache.popitem(last=False)
+
+    def clear(self):
+        """
+        Clears the whole cache
+        """
+        with self.__lock:
+            self.cache.clear()
+
+
+def _news_content(item):
+    # yfinance nests the fields of newer news items in "content"
+    return item.get("content") or item
+
+
+def _news_key(item):
+    content = _news_content(item)
+    return item.get("id") or item.get("uuid") or content.get("id") or (content.get("title"), content.get("link"))
+
+
+def _news_time(item):
+    content = _news_content(item)
+    published = content.get("providerPublishTime") or content.get("publisherPublishTime")
+    if published:
+        return published
+    try:
+        return datetime.fromisoformat(content.get("pubDate")).timestamp()
+    except (TypeError, ValueError):
+        return 0
+
+
+class NewsStore:
+    """
+    News per ticker kept as deduplicated ring buffer sorted by publish time (newest first).
+    Refreshed items are merged in, reads are cheap slices.
+    """
+    def __init__(self, ttl_minutes=5, max_items=50):
+        """
+        Constructor for NewsStore
+
+        Parameters
+        ----------
+        ttl_minutes : float, optional
+            The time after which the news of a ticker are refreshed in minutes. Default is 5-minutes.
+        max_items : int, optional
+            The maximum number of news kept per ticker, older news are dropped first. Default is 50.
+        """
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.max_items = max_items
+        self.__lock = threading.Lock()
+        self.__buffers = {}
+
+    def get(self, ticker, limit=10, now=None):
+        """
+        Gets the newest news for the provided ticker if they were refreshed within the time to live
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to get the news for
+        limit : int, optional
+            The maximum number of news. Default is 10
+        now : datetime.datetime, optional
+            The time to check the time to live against
+        Returns
+        -------
+        list[dict] | None
+            The news, None if there are none or they have to be refreshed
+        """
+        now = now or datetime.now()
+        with self.__lock:
+            buffer = self.__buffers.get(ticker)
+            if buffer is None or now - buffer[2] >= self.ttl:
+                return None
+            return list(islice(buffer[0], limit))
+
+    def merge(self, ticker, items, now=None):
+        """
+        Merges the provided items into the news of the provided ticker. Known items are skipped.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker the news belong to
+        items : list of dict
+            The fetched news
+        now : datetime.datetime, optional
+            The time of the refresh
+        """
+        now = now or datetime.now()
+        with self.__lock:
+            news, keys, _ = self.__buffers.get(ticker) or (deque(maxlen=self.max_items), set(), None)
+            new_items = []
+            for item in items:
+                key = _news_key(item)
+                if key not in keys:
+                    keys.add(key)
+                    new_items.append(item)
+            if new_items:
+                # Stable sort: items without publish time keep their order
+                merged = sorted([*new_items, *news], key=_news_time, reverse=True)
+                news = deque(merged[:self.max_items], maxlen=self.max_items)
+                for item in merged[self.max_items:]:
+                    keys.discard(_news_key(item))
+            self.__buffers[ticker] = (news, keys, now)
+
+    def clear(self):
+        """
+        Clears the news of all tickers
+        """
+        with self.__lock:
+            self.__buffers.clear()
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls for the same keys: the first caller of a key fetches it,
+    all other callers wait for its result instead of fetching it again
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls = {}
+
+    def claim(self, keys):
+        """
+        Claims the provided keys. Keys not in flight are owned by the caller,
+        who has to resolve them, for all other keys the pending futures are returned.
+
+        Parameters
+        ----------
+        keys : list of Hashable
+            The keys to claim
+        Returns
+        -------
+        tuple[list, dict[Hashable, Future]]
+            The owned keys and the futures of the keys fetched by other callers
+        """
+        owned = []
+        pending = {}
+        with self.__lock:
+            for key in keys:
+                future = self.__calls.get(key)
+                if future is None:
+                    self.__calls[key] = Future()
+                    owned.append(key)
+                else:
+                    pending[key] = future
+        return owned, pending
+
+    def resolve(self, key, value=None, error=None):
+        """
+        Resolves the owned key and wakes up all waiting callers
+
+        Parameters
+        ----------
+        key : Hashable
+            The owned key
+        value : object, optional
+            The result for the key
+        error : Exception, optional
+            The error raised while fetching the key
+        """
+        with self.__lock:
+            future = self.__calls.pop(key, None)
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def do(self, key, function):
+        """
+        Calls the provided function once for all concurrent callers of the key
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the call
+        function : Callable
+            The function to call
+        Returns
+        -------
+        object
+            The result of the function
+        """
+        owned, pending = self.claim([key])
+        if not owned:
+            return pending[key].result()
+        try:
+            result = function()
+        except Exception as e:
+            self.resolve(key, error=e)
+            raise
+        self.resolve(key, result)
+        return result
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent callers for a short time window
+    and processes all items of the same group with one call
+    """
+    def __init__(self, window_seconds, function):
+        """
+        Constructor for MicroBatcher
+
+        Parameters
+        ----------
+        window_seconds : float
+            The time window in seconds items are collected for
+        function : Callable[[Hashable, list], dict]
+            Processes the items of one group and returns the result per item
+        """
+        self.window = window_seconds
+        self.function = function
+        self.__lock = threading.Lock()
+        self.__batches = {}
+
+    def submit(self, group, items):
+        """
+        Submits the provided items to the batch of the provided group
+
+        Parameters
+        ----------
+        group : Hashable
+            The group the items belong to, e.g. the download arguments
+        items : list of Hashable
+            The items to process
+        Returns
+        -------
+        dict[Hashable, Future]
+            The future of each item
+        """
+        with self.__lock:
+            batch = self.__batches.get(group)
+            if batch is None:
+                batch = self.__batches[group] = {}
+                timer = threading.Timer(self.window, self.__flush, args=(group,))
+                timer.daemon = True
+                timer.start()
+            return {item: batch.setdefault(item, Future()) for item in items}
+
+    def __flush(self, group):
+        with self.__lock:
+            batch = self.__batches.pop(group, {})
+        if not batch:
+            return
+        try:
+            results = self.function(group, list(batch))
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+            return
+        for item, future in batch.items():
+            future.set_result(results.get(item))
+
+
+class TickerRefresher:
+    """
+    Background thread refreshing the tickers watched by any session shortly before their cache entries expire
+    """
+    def __init__(self, refresh, check_seconds=30, watch_minutes=30, trading_hours=(8, 22)):
+        """
+        Constructor for TickerRefresher
+
+        Parameters
+        ----------
+        refresh : Callable[[list, str, datetime.datetime], object]
+            Refreshes the provided tickers for the provided period
+        check_seconds : float, optional
+            The time in seconds between two checks. Default is 30-seconds
+        watch_minutes : float, optional
+            The time in minutes a ticker stays watched after its last request. Default is 30-minutes
+        trading_hours : tuple[int, int], optional
+            The hours (local time) between which tickers are refreshed on weekdays. Default is 8 to 22
+        """
+        self.refresh = refresh
+        self.check_seconds = check_seconds
+        self.watch_time = timedelta(minutes=watch_minutes)
+        self.trading_hours = trading_hours
+        self.__lock = threading.Lock()
+        self.__watched = {}
+        self.__stopped = threading.Event()
+        self.__thread = None
+
+    def watch(self, tickers, period, now=None):
+        """
+        Marks the provided tickers as watched for the provided period
+
+        Parameters
+        ----------
+        tickers : list of str
+            The tickers requested by a session
+        period : str
+            The period requested by the session
+        now : datetime.datetime, optional
+            The time of the request
+        """
+        now = now or datetime.now()
+        with self.__lock:
+            for ticker in tickers:
+                self.__watched[(ticker, period)] = now
+
+    def watched(self, now=None):
+        """
+        Gets the watched tickers grouped by period. Tickers not requested within the watch time are dropped.
+
+        Parameters
+        ----------
+        now : datetime.datetime, optional
+            The time to check the watch time against
+        Returns
+        -------
+        dict[str, list[str]]
+            The watched tickers per period
+        """
+        now = now or datetime.now()
+        groups = {}
+        with self.__lock:
+            for key, last_seen in list(self.__watched.items()):
+                if now - last_seen > self.watch_time:
+                    self.__watched.pop(key)
+                else:
+                    groups.setdefault(key[1], []).append(key[0])
+        return groups
+
+    def run_once(self, now=None):
+        """
+        Refreshes all watched tickers if within the trading hours
+
+        Parameters
+        ----------
+        now : datetime.datetime, optional
+            The time of the check
+        Returns
+        -------
+        dict[str, list[str]]
+            The refreshed tickers per period
+        """
+        now = now or datetime.now()
+        groups = self.watched(now)
+        if not tu.is_trading_time(now, *self.trading_hours):
+            return {}
+        for period, tickers in groups.items():
+            self.refresh(tickers, period, now)
+        return groups
+
+    def start(self):
+        """
+        Starts the background thread if it is not running yet
+        """
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__run, name='ticker-refresher', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread
+        """
+        self.__stopped.set()
+
+    def __run(self):
+        while not self.__stopped.wait(self.check_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                pass
+
+
+def _overlaps(cached, data):
+    if not isinstance(cached, pd.DataFrame) or not isinstance(data, pd.DataFrame):
+        return False
+    if cached.empty or data.empty:
+        return False
+    return data.index.min() <= cached.index.max() and data.index.max() >= cached.index.min()
+
+
+class CacheEntry:
+    """
+    Single cached ticker frame together with the date range it covers and its fetch time
+    """
+    def __init__(self, data, min_date, timestamp, max_date=None):
+        """
+        Constructor for CacheEntry
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The cached data
+        min_date : datetime.datetime
+            The minimum date covered by the data
+        timestamp : datetime.datetime
+            The time when the data was fetched
+        max_date : datetime.datetime, optional
+            The (exclusive) end date covered by the data. None if the data reaches up to the fetch time.
+        """
+        self.data = data
+        self.min_date = min_date
+        self.timestamp = timestamp
+        self.max_date = max_date
+        self.nbytes = int(data.memory_usage(index=True).sum()) if isinstance(data, pd.DataFrame) else 0
+        self.summary = tu.get_summary(data)
+        self.__summaries = {}
+        # interval -> frame derived from the data, the entry is replaced whenever the data changes
+        self.__resampled = {}
+
+    def is_valid(self, now, ttl):
+        """
+        Checks if the entry is still within the provided time to live
+
+        Parameters
+        ----------
+        now : datetime.datetime
+            The time to check against
+        ttl : timedelta
+            The time to live of the entry
+        Returns
+        -------
+        bool
+            True if the entry has not expired yet
+        """
+        return now - self.timestamp < ttl
+
+    def covers(self, min_date):
+        """
+        Checks if the entry holds data starting at or before the provided min_date
+
+        Parameters
+        ----------
+        min_date : datetime.datetime | None
+            The minimum date that has to be covered
+        Returns
+        -------
+        bool
+            True if the entry covers the provided min_date
+        """
+        return min_date is not None and min_date >= self.min_date
+
+    def is_current(self):
+        """
+        Checks if the entry reaches up to its fetch time, i.e. was not fetched for a range ending in the past
+
+        Returns
+        -------
+        bool
+            True if the entry reaches up to its fetch time
+        """
+        return self.max_date is None
+
+    def slice(self, min_date, max_date=None):
+        """
+        Gets the rows of the data between min_date and max_date, see ticker_utils.slice_history_frame.
+        The TickerSummary of the slice is memoised per slice and attached as DataFrame.attrs["summary"],
+        together with DataFrame.attrs["source"] identifying the entry and the slice.
+
+        Parameters
+        ----------
+        min_date : datetime.datetime | None
+            The minimum date of the returned rows
+        max_date : datetime.datetime | None, optional
+            The exclusive maximum date of the returned rows. Default is no limit
+        Returns
+        -------
+        DataFrame | object
+            The rows between min_date and max_date
+        """
+        data = tu.slice_history_frame(self.data, min_date, max_date)
+        if not isinstance(data, pd.DataFrame) or data.empty:
+            return data
+        key = (data.index[0], len(data))
+        summary = self.__summaries.get(key)
+        if summary is None:
+            summary = self.summary if len(data) == len(self.data) else tu.summarize_history_frame(data)
+            self.__summaries[key] = summary
+        # Plain values, attrs are deep-copied by pandas so object identities do not survive
+        data.attrs = {**data.attrs, 'summary': summary, 'source': (id(self), self.timestamp, *key)}
+        return data
+
+    def resample(self, interval):
+        """
+        Gets the data aggregated into bars of the provided coarser interval, see ticker_utils.resample_history_frame.
+        The result is memoised per interval.
+
+        Parameters
+        ----------
+        interval : str
+            The interval of the bars, e.g. 1wk
+        Returns
+        -------
+        CacheEntry
+            An entry holding the aggregated data with the range and fetch time of this entry
+        """
+        entry = self.__resampled.get(interval)
+        if entry is None:
+            data = tu.resample_history_frame(tu.restore_history_frame(self.data), interval)
+            entry = self.__resampled[interval] = CacheEntry(data, self.min_date, self.timestamp, self.max_date)
+        return entry
+
+    def covers_range(self, start, end, now, ttl):
+        """
+        Checks if the entry holds all data between start and end. Data before the fetch day
+        is final, so ranges ending before it are covered even if the entry has expired.
+
+        Parameters
+        ----------
+        start : datetime.datetime
+            The start date of the range
+        end : datetime.datetime
+            The exclusive end date of the range
+        now : datetime.datetime
+            The time to check the time to live against
+        ttl : timedelta
+            The time to live of the entry
+        Returns
+        -------
+        bool
+            True if the entry covers the range
+        """
+        if start < self.min_date:
+            return False
+        if self.max_date is not None:
+            return end <= self.max_date
+        return end <= self.timestamp.replace(hour=0, minute=0, second=0, microsecond=0) or self.is_valid(now, ttl)
+
+
+class TickerStore:
+    """
+    Persistent on-disk tier for cached ticker data. Stores one uncompressed Feather file
+    per ticker and interval, which is memory-mapped on read. Requires pyarrow.
+    """
+    __metadata_key = b'finland'
+
+    def __init__(self, directory, interval='1d'):
+        """
+        Constructor for TickerStore
+
+        Parameters
+        ----------
+        directory : str
+            The directory to store the files in
+        interval : str, optional
+            The default bar interval of the stored data. Default is 1-day
+        """
+        self.directory = directory
+        self.interval = interval
+        self.enabled = feather is not None
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    def path(self, ticker, interval=None):
+        """
+        Gets the file path for the provided ticker
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to get the path for
+        interval : str, optional
+            The bar interval. Default is the interval of the store
+        Returns
+        -------
+        str
+            The file path
+        """
+        return os.path.join(self.directory, f'{quote(ticker, safe="")}_{interval or self.interval}.feather')
+
+    def load(self, ticker, interval=None):
+        """
+        Loads the stored entry for the provided ticker
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to load the entry for
+        interval : str, optional
+            The bar interval. Default is the interval of the store
+        Returns
+        -------
+        CacheEntry | None
+            The stored entry or None if there is no readable file
+        """
+        if not self.enabled:
+            return None
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            table = feather.read_table(path, memory_map=True)
+            meta = json.loads(table.schema.metadata[self.__metadata_key])
+            data = table.to_pandas()
+        except Exception:
+            return None
+        max_date = datetime.fromisoformat(meta['max_date']) if meta.get('max_date') else None
+        return CacheEntry(data, datetime.fromisoformat(meta['min_date']), datetime.fromisoformat(meta['timestamp']),
+                          max_date)
+
+    def save(self, ticker, entry, interval=None):
+        """
+        Stores the provided entry for the provided ticker. Only DataFrames are stored.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to store the entry for
+        entry : CacheEntry
+            The entry to store
+        interval : str, optional
+            The bar interval. Default is the interval of the store
+        """
+        if not self.enabled or not isinstance(entry.data, pd.DataFrame) or entry.data.empty:
+            return
+        path = self.path(ticker, interval)
+        tmp_path = None
+        try:
+            # Own temporary file per write, concurrent writers of the same ticker must not share one
+            handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            os.close(handle)
+            # attrs hold runtime objects like the TickerSummary which are not persisted
+            data = entry.data.copy(deep=False)
+            data.attrs = {}
+            table = pa.Table.from_pandas(data, preserve_index=True)
+            meta = json.dumps({
+                'min_date': pd.Timestamp(entry.min_date).isoformat(),
+                'timestamp': pd.Timestamp(entry.timestamp).isoformat(),
+                'max_date': pd.Timestamp(entry.max_date).isoformat() if entry.max_date is not None else None,
+            })
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), self.__metadata_key: meta})
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+        except Exception:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def delete(self, ticker, interval=None):
+        """
+        Deletes the stored file for the provided ticker
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to delete the file for
+        interval : str, optional
+            The bar interval. Default is the interval of the store
+        """
+        path = self.path(ticker, interval)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def clear(self, interval=None):
+        """
+        Deletes all stored files of the provided interval
+
+        Parameters
+        ----------
+        interval : str, optional
+            The bar interval. Default is all intervals
+        """
+        if not os.path.isdir(self.directory):
+            return
+        suffix = f'_{interval}.feather' if interval else '.feather'
+        for name in os.listdir(self.directory):
+            if name.endswith(suffix):
+                os.remove(os.path.join(self.directory, name))
+
+
 class TickerCache:
     """
-    Class for managing cached ticker data
+    Class for managing cached ticker data. Holds the widest date range seen per ticker and interval,
+    narrower periods are served as slices of it. Optionally backed by a persistent TickerStore.
     """
-    def __init__(self, ttl_minutes=5):
-        self.cache = {}
-        self.cache.setdefault(None)
+    def __init__(self, ttl_minutes=5, store=None, max_entries=None, max_bytes=None, retention_minutes=60,
+                 compact=False, interval_ttl_minutes=None, interval_retention_minutes=None, on_remove=None):
+        """
+        Constructor for TickerCache
+
+        Parameters
+        ----------
+        ttl_minutes : int, optional
+            The time to live for the cache in minutes. Default is 5-minutes.
+        store : TickerStore, optional
+            The persistent tier to load missing entries from and write new entries to
+        max_entries : int, optional
+            The maximum number of entries kept in memory. Default is unbounded.
+        max_bytes : int, optional
+            The maximum summed DataFrame memory usage kept in memory. Default is unbounded.
+        retention_minutes : int, optional
+            The time in minutes an expired entry is kept in memory for delta refreshes before it is purged.
+            Default is 60-minutes.
+        compact : bool, optional
+            If True, cached frames are kept with float32 prices, narrowed Volume and an index shared by all
+            tickers with the same dates. Prices float32 cannot hold to the cent stay float64. Data returned
+            by get and get_range has its dtypes restored (prices rounded to 2 decimals). Default is False.
+        interval_ttl_minutes : dict[str, int], optional
+            The time to live in minutes per interval, e.g. shorter for intraday bars. Intervals missing here use
+            ttl_minutes.
+        interval_retention_minutes : dict[str, int], optional
+            The retention time in minutes per interval. Intervals missing here use retention_minutes.
+        on_remove : callable, optional
+            Called with the ticker whenever one of its entries is replaced, evicted, purged or cleared
+        """
+        self.cache = OrderedDict()
         self.ttl = timedelta(minutes=ttl_minutes)
+        self.store = store
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.retention = self.ttl + timedelta(minutes=retention_minutes)
+        self.interval_ttls = {interval: timedelta(minutes=minutes)
+                              for interval, minutes in (interval_ttl_minutes or {}).items()}
+        self.interval_retentions = {interval: timedelta(minutes=minutes)
+                                    for interval, minutes in (interval_retention_minutes or {}).items()}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.compact = compact
+        self.on_remove = on_remove
+        self.__calendars = weakref.WeakValueDictionary()
+        # Shared by all sessions of the TickerWrapper singleton
+        self.__lock = threading.RLock()
+
+    def stats(self):
+        """
+        Gets the counters of the cache
+
+        Returns
+        -------
+        dict[str, int]
+            The number of entries, their memory usage and the hit, miss, eviction and expiration counters
+        """
+        with self.__lock:
+            return {
+                'entries': len(self.cache),
+                'bytes': self.nbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def get_ttl(self, interval='1d'):
+        """
+        Gets the time to live of the provided interval
+
+        Parameters
+        ----------
+        interval : str, optional
+            The bar interval. Default is 1-day
+        Returns
+        -------
+        datetime.timedelta
+            The time to live
+        """
+        return self.interval_ttls.get(interval, self.ttl)
+
+    def get_retention(self, interval='1d'):
+        """
+        Gets the time an entry of the provided interval is kept in memory, the time to live plus the retention time
+
+        Parameters
+        ----------
+        interval : str, optional
+            The bar interval. Default is 1-day
+        Returns
+        -------
+        datetime.timedelta
+            The time to live plus the retention time
+        """
+        return self.get_ttl(interval) + self.interval_retentions.get(interval, self.retention - self.ttl)
+
+    def purge_expired(self, now=None):
+        """
+        Removes all entries from memory that are older than the time to live plus the retention time.
+        Persisted entries stay in the store.
+
+        Parameters
+        ----------
+        now : datetime.datetime, optional
+            The time to check the entries against
+        """
+        now = now or datetime.now()
+        with self.__lock:
+            expired = [key for key, entry in self.cache.items() if not entry.is_valid(now, self.get_retention(key[1]))]
+            for key in expired:
+                self.__remove(key)
+                self.expirations += 1
+
+    def __insert(self, key, entry):
+        self.__remove(key)
+        if self.compact and isinstance(entry.data, pd.DataFrame):
+            entry.data = tu.compact_history_frame(entry.data, self.__calendars)
+            # The index is shared with other entries and not counted
+            entry.nbytes = int(entry.data.memory_usage(index=False).sum())
+        self.cache[key] = entry
+        self.nbytes += entry.nbytes
+        # Least recently used entries are at the front, the new entry itself is never evicted
+        while len(self.cache) > 1 and (
+                (self.max_entries is not None and len(self.cache) > self.max_entries)
+                or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            self.__remove(next(iter(self.cache)))
+            self.evictions += 1
+
+    def __count_hit(self):
+        with self.__lock:
+            self.hits += 1
+
+    def __count_miss(self):
+        with self.__lock:
+            self.misses += 1
+
+    def __remove(self, key):
+        entry = self.cache.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry.nbytes
+            if self.on_remove is not None:
+                self.on_remove(key[0])
+
+    def get_entry(self, ticker, interval='1d'):
+        """
+        Gets the cache entry for the provided ticker and interval regardless of its age.
+        Entries missing in memory are loaded from the persistent store if there is one.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to get the entry for
+        interval : str, optional
+            The bar interval. Default is 1-day
+        Returns
+        -------
+        CacheEntry | None
+            The found entry
+        """
+        key = (ticker, interval)
+        with self.__lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+                return entry
+        if self.store is None:
+            return None
+        entry = self.store.load(ticker, interval)
+        if entry is None:
+            return None
+        with self.__lock:
+            # Another thread may have set a newer entry while the file was read
+            if key not in self.cache:
+                self.__insert(key, entry)
+            return self.cache[key]
+
+    def __entries(self, ticker, interval):
+        # The own entry first, then the finer entries the bars can be derived from (finest first)
+        yield interval, self.get_entry(ticker, interval)
+        for source in tu.get_resample_sources(interval):
+            yield source, self.get_entry(ticker, source)
 
-    def get(self, ticker, period, now=datetime.now()):
+    def get(self, ticker, period, now=None, interval='1d'):
         """
-        Gets the data for the provided ticker in the provided period from the cache if still valid
+        Gets the data for the provided ticker in the provided period from the cache if still valid.
+        If there is no valid entry of the interval, the bars are derived from the finest valid entry of a finer
+        interval covering the period (e.g. weekly bars from daily bars) instead.
 
         Parameters
         ----------
@@ -31,21 +971,117 @@ class TickerCache:
             The tickers to get the data for
         period : str
             The period to get the data for
+        now : datetime.datetime, optional
+            The time to check the time to live against
+        interval : str, optional
+            The bar interval. Default is 1-day
         Returns
         -------
         DataFrame | None
             The found tickers data
         """
-        if ticker in self.cache:
-            cached_data, cached_min_date, cached_timestamp = self.cache[ticker]
-            min_date = tu.get_min_date_in_period_from_now(period, now)
-            if now - cached_timestamp < self.ttl and min_date >= cached_min_date:
-                return cached_data
+        now = now or datetime.now()
+        min_date = tu.get_min_date_in_period_from_now(period, now)
+        for source, entry in self.__entries(ticker, interval):
+            if entry is not None and entry.is_current() and entry.is_valid(now, self.get_ttl(source)) \
+                    and entry.covers(min_date):
+                if source != interval:
+                    entry = entry.resample(interval)
+                self.__count_hit()
+                return tu.restore_history_frame(entry.slice(tu.get_period_start(entry.data, period, now)))
+        self.__count_miss()
+        return None
+
+    def get_stale(self, ticker, period, now=None, interval='1d'):
+        """
+        Gets the expired (or ending in the past) cache entry for the provided ticker if it still covers the provided
+        period. Used to refresh only the tail of the cached data instead of downloading the whole period again.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to get the entry for
+        period : str
+            The period the entry has to cover
+        now : datetime.datetime, optional
+            The time to check the time to live against
+        interval : str, optional
+            The bar interval. Default is 1-day
+        Returns
+        -------
+        CacheEntry | None
+            The expired entry or None if there is no such entry
+        """
+        now = now or datetime.now()
+        entry = self.get_entry(ticker, interval)
+        if entry is not None and not (entry.is_current() and entry.is_valid(now, self.get_ttl(interval))):
+            if entry.covers(tu.get_min_date_in_period_from_now(period, now)):
+                return entry
+        return None
+
+    def get_partial(self, ticker, period, now=None, interval='1d'):
+        """
+        Gets the valid cache entry for the provided ticker if it covers only the most recent part of the period.
+        Used to download only the missing older range instead of the whole period.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to get the entry for
+        period : str
+            The period the entry has to cover
+        now : datetime.datetime, optional
+            The time to check the time to live against
+        interval : str, optional
+            The bar interval. Default is 1-day
+        Returns
+        -------
+        CacheEntry | None
+            The partial entry or None if there is no such entry
+        """
+        now = now or datetime.now()
+        entry = self.get_entry(ticker, interval)
+        if entry is not None and entry.is_current() and entry.is_valid(now, self.get_ttl(interval)):
+            if not entry.covers(tu.get_min_date_in_period_from_now(period, now)):
+                return entry
         return None
 
-    def set_ticker(self, ticker, data, min_date, now):
+    def get_range(self, ticker, start, end, now=None, interval='1d'):
         """
-        Sets the provided data for the provided ticker for the provided period in the cache
+        Gets the data for the provided ticker between start and end from the cache if the cached data covers it.
+        Like get, the bars are derived from a finer interval if there is no entry of the interval covering the range.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to get the data for
+        start : datetime.datetime
+            The start date of the range
+        end : datetime.datetime
+            The exclusive end date of the range
+        now : datetime.datetime, optional
+            The time to check the time to live against
+        interval : str, optional
+            The bar interval. Default is 1-day
+        Returns
+        -------
+        DataFrame | None
+            The found tickers data
+        """
+        now = now or datetime.now()
+        for source, entry in self.__entries(ticker, interval):
+            if entry is not None and entry.covers_range(start, end, now, self.get_ttl(source)):
+                if source != interval:
+                    entry = entry.resample(interval)
+                self.__count_hit()
+                return tu.restore_history_frame(entry.slice(start, end))
+        self.__count_miss()
+        return None
+
+    def set_ticker(self, ticker, data, min_date, now, max_date=None, interval='1d'):
+        """
+        Sets the provided data for the provided ticker for the provided period in the cache.
+        If the cached data overlaps the provided data, both are merged so the cache keeps the widest range.
 
         Parameters
         ----------
@@ -57,10 +1093,29 @@ class TickerCache:
             The minimum date in the data
         now: datetime.datetime
             The time when the data was fetched
+        max_date : datetime.datetime, optional
+            The exclusive end date of the data. None if the data reaches up to now.
+        interval : str, optional
+            The bar interval of the data. Default is 1-day
         """
-        self.cache[ticker] = (data, min_date, now)
+        key = (ticker, interval)
+        # Loads a persisted entry outside the lock, reading and replacing the entry happens atomically
+        self.get_entry(ticker, interval)
+        with self.__lock:
+            entry = self.cache.get(key)
+            if entry is not None and _overlaps(entry.data, data):
+                data = tu.merge_history_frames(entry.data, data)
+                min_date = min(min_date, entry.min_date)
+                if max_date is not None:
+                    # The merged data ends where the cached data ended or where the new data ends
+                    max_date = max(max_date, entry.max_date or entry.timestamp)
+            entry = CacheEntry(data, min_date, now, max_date)
+            self.purge_expired(now)
+            self.__insert(key, entry)
+        if self.store is not None:
+            self.store.save(ticker, entry, interval)
 
-    def set_tickers(self, tickers, period):
+    def set_tickers(self, tickers, period, interval='1d'):
         """
         Sets the provided data for the provided tickers for the provided period in the cache
 
@@ -70,14 +1125,16 @@ class TickerCache:
             The tickers data
         period : str
             The period the data was watched for
+        interval : str, optional
+            The bar interval of the data. Default is 1-day
         """
         if isinstance(tickers, dict):
             now = datetime.now()
             min_date = tu.get_min_date_in_period_from_now(period, now)
             for ticker in tickers:
-                self.set_ticker(ticker, tickers[ticker], min_date, now)
+                self.set_ticker(ticker, tickers[ticker], min_date, now, interval=interval)
 
-    def clear_ticker(self, ticker):
+    def clear_ticker(self, ticker, interval=None):
         """
         Deletes the provided ticker data from the cache
 
@@ -85,12 +1142,244 @@ class TickerCache:
         ----------
         ticker : str
             The ticker to delete from the cache
+        interval : str, optional
+            The bar interval to delete. Default is all intervals
         """
-        if ticker in self.cache:
-            self.cache.pop(ticker)
+        with self.__lock:
+            keys = [key for key in self.cache if key[0] == ticker and interval in (None, key[1])]
+            for key in keys:
+                self.__remove(key)
+        if self.store is not None:
+            intervals = {key[1] for key in keys} | {interval or self.store.interval}
+            for key_interval in intervals:
+                self.store.delete(ticker, key_interval)
 
     def clear(self):
         """
         Clears the whole cache
         """
-        self.cache.clear()
\ No newline at end of file
+        with self.__lock:
+            for key in list(self.cache):
+                self.__remove(key)
+        if self.store is not None:
+            self.store.clear()
+
+class _PanelCalendar:
+    """
+    Dates and field arrays (rows × dates) of one exchange calendar in the PanelStore
+    """
+    def __init__(self, index, dtypes):
+        self.index = index
+        self.dtypes = dtypes
+        self.rows = 0
+        self.live = set()
+        self.arrays = {field: self.__allocate(dtype, 4) for field, dtype in dtypes}
+        self.__spans = {}
+
+    def __allocate(self, dtype, capacity):
+        fill = np.nan if np.issubdtype(dtype, np.floating) else 0
+        return np.full((capacity, len(self.index)), fill, dtype=dtype)
+
+    def locate(self, frame, dtypes):
+        index = frame.index
+        if dtypes != self.dtypes or index.dtype != self.index.dtype:
+            return None
+        start = int(self.index.searchsorted(index[0]))
+        stop = start + len(index)
+        if stop > len(self.index) or not self.index[start:stop].equals(index):
+            return None
+        return start, stop
+
+    def append(self, frame, start, stop):
+        capacity = next(iter(self.arrays.values())).shape[0]
+        if self.rows == capacity:
+            self.__resize(capacity * 2, range(self.rows))
+        for field, _ in self.dtypes:
+            self.arrays[field][self.rows, start:stop] = frame[field].to_numpy()
+        self.rows += 1
+        self.live.add(self.rows - 1)
+        return self.rows - 1
+
+    def compact(self):
+        rows = sorted(self.live)
+        self.__resize(max(4, 2 * len(rows)), rows)
+        self.rows = len(rows)
+        self.live = set(range(self.rows))
+        return {row: position for position, row in enumerate(rows)}
+
+    def __resize(self, capacity, rows):
+        # New arrays: views handed out earlier keep the old ones alive and unchanged
+        arrays = {}
+        for field, dtype in self.dtypes:
+            arrays[field] = self.__allocate(dtype, capacity)
+            arrays[field][:len(rows)] = self.arrays[field][list(rows)]
+        self.arrays = arrays
+
+    def span_index(self, start, stop):
+        # Views of the same span share one index object, so they are recognised as aligned without comparing
+        index = self.__spans.get((start, stop))
+        if index is None:
+            index = self.__spans[(start, stop)] = self.index[start:stop]
+        return index
+
+    def view(self, row, start, stop):
+        columns = {}
+        for field, _ in self.dtypes:
+            values = self.arrays[field][row, start:stop]
+            values.flags.writeable = False
+            columns[field] = values
+        return pd.DataFrame(columns, index=self.span_index(start, stop), copy=False)
+
+
+class PanelStore:
+    """
+    Column store for ticker frames: one DatetimeIndex per exchange calendar and one 2-D array (tickers × dates)
+    per field. Frames are handed out as read-only views into these arrays without copying. Rows are never
+    overwritten, so views handed out earlier stay valid when a ticker is updated.
+    """
+    def __init__(self):
+        """
+        Constructor for PanelStore
+        """
+        self.__lock = threading.Lock()
+        self.__calendars = []
+        # ticker -> (calendar, row, start, stop, source)
+        self.__tickers = {}
+
+    def __len__(self):
+        return len(self.__tickers)
+
+    def set(self, ticker, frame):
+        """
+        Stores the provided frame for the provided ticker
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker the frame belongs to
+        frame : pd.DataFrame
+            The sorted numeric ticker data
+        Returns
+        -------
+        pd.DataFrame | object
+            The view of the stored frame (with the attrs of frame). Frames that cannot be stored
+            (empty, not numeric or without a sorted DatetimeIndex) are returned unchanged
+        """
+        if not isinstance(frame, pd.DataFrame) or frame.empty or not isinstance(frame.index, pd.DatetimeIndex) \
+                or not frame.index.is_monotonic_increasing or not frame.index.is_unique:
+            return frame
+        dtypes = tuple((column, frame[column].dtype) for column in frame.columns)
+        if not all(isinstance(column, str) and pd.api.types.is_numeric_dtype(dtype) for column, dtype in dtypes):
+            return frame
+
+        source = frame.attrs.get('source')
+        with self.__lock:
+            current = self.__tickers.get(ticker)
+            if current is not None and source is not None and current[4] == source:
+                # Same slice of the same cache entry, nothing to copy
+                view = current[0].view(*current[1:4])
+            else:
+                for calendar in self.__calendars:
+                    span = calendar.locate(frame, dtypes)
+                    if span is not None:
+                        break
+                else:
+                    calendar = _PanelCalendar(frame.index, dtypes)
+                    self.__calendars.append(calendar)
+                    span = (0, len(frame.index))
+                self.__tickers[ticker] = (calendar, calendar.append(frame, *span), *span, source)
+                if current is not None:
+                    self.__release(current)
+                view = calendar.view(*self.__tickers[ticker][1:4])
+        view.attrs = dict(frame.attrs)
+        return view
+
+    def get(self, ticker):
+        """
+        Gets the view of the stored frame for the provided ticker
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to get the frame for
+        Returns
+        -------
+        pd.DataFrame | None
+            The view of the stored frame
+        """
+        with self.__lock:
+            current = self.__tickers.get(ticker)
+            return current[0].view(*current[1:4]) if current is not None else None
+
+    def frame(self, tickers, field='Close'):
+        """
+        Gets the provided field of the provided tickers as one DataFrame with the tickers as columns.
+        Tickers of the same calendar are aligned by array operations only.
+
+        Parameters
+        ----------
+        tickers : list of str
+            The tickers to get the field for, in column order
+        field : str, optional
+            The field to get. Default is Close
+        Returns
+        -------
+        pd.DataFrame
+            The field values per ticker, NaN where a ticker has no data
+        """
+        groups = {}
+        with self.__lock:
+            for ticker in tickers:
+                current = self.__tickers.get(ticker)
+                if current is not None and field in current[0].arrays:
+                    groups.setdefault(id(current[0]), []).append((ticker, *current[:4]))
+            frames = [self.__field_frame(group, field) for group in groups.values()]
+
+        if not frames:
+            return pd.DataFrame()
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1).sort_index()
+        return frame[[t for t in tickers if t in frame.columns]]
+
+    def __field_frame(self, group, field):
+        calendar = group[0][1]
+        start = min(item[3] for item in group)
+        stop = max(item[4] for item in group)
+        values = calendar.arrays[field][[item[2] for item in group], start:stop].T.astype(float)
+        for column, (_, _, _, row_start, row_stop) in enumerate(group):
+            values[:row_start - start, column] = np.nan
+            values[row_stop - start:, column] = np.nan
+        return pd.DataFrame(values, index=calendar.span_index(start, stop), columns=[item[0] for item in group])
+
+    def discard(self, ticker):
+        """
+        Removes the frame of the provided ticker. Views handed out earlier stay valid.
+
+        Parameters
+        ----------
+        ticker : str
+            The ticker to remove the frame for
+        """
+        with self.__lock:
+            current = self.__tickers.pop(ticker, None)
+            if current is not None:
+                self.__release(current)
+
+    def __release(self, current):
+        calendar, row = current[0], current[1]
+        calendar.live.discard(row)
+        if not calendar.live:
+            self.__calendars.remove(calendar)
+        elif calendar.rows >= 8 and calendar.rows > 2 * len(calendar.live):
+            # More dead than live rows: copy the live rows into new arrays
+            moved = calendar.compact()
+            for ticker, (owner, old_row, *rest) in list(self.__tickers.items()):
+                if owner is calendar:
+                    self.__tickers[ticker] = (owner, moved[old_row], *rest)
+
+    def clear(self):
+        """
+        Removes all frames. Views handed out earlier stay valid.
+        """
+        with self.__lock:
+            self.__calendars.clear()
+            self.__tickers.clear()
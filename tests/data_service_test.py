@@ -57,10 +57,28 @@ def _reset_singleton_and_cache():
     THEN: dürfen sich Tests nicht gegenseitig beeinflussen.
 
     -> Deshalb setzen wir die Singleton-Instanz vor und nach JEDEM Test zurück.
+       Singleton.__new__ speichert die Instanz an der konkreten Klasse, daher auch an TickerWrapper.
     """
     utils.Singleton._Singleton__instance = None
+    ds.TickerWrapper._Singleton__instance = None
     yield
     utils.Singleton._Singleton__instance = None
+    ds.TickerWrapper._Singleton__instance = None
+
+
+def _recent_df(days, close_offset=0.0):
+    """Hilfsfunktion: Kurs-DataFrame mit den letzten `days` Tagen bis heute."""
+    idx = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, freq="D")
+    values = [10.0 + close_offset + i for i in range(days)]
+    return pd.DataFrame(
+        {"Open": values, "High": values, "Low": values, "Close": values, "Volume": [1000] * days},
+        index=idx,
+    )
+
+
+def _feed_response(status, etag=None):
+    """Hilfsfunktion: HTTP-Antwort eines RSS-Feeds (der Inhalt wird im Test per feedparser.parse-Mock geliefert)."""
+    return MagicMock(status_code=status, content=b"", headers={"etag": etag} if etag else {})
 
 
 def _sample_singleindex_df():
@@ -239,12 +257,808 @@ def test_TC_DS_008_google_news_rss_uses_quote_plus_url_encoding():
     # GIVEN: Query enthält Sonderzeichen und Leerzeichen (kritisch für URLs)
     query = "S&P 500"
 
-    # WHEN: _google_news_rss baut die URL und ruft feedparser.parse(url) auf
-    with patch("data_service.feedparser.parse") as parse_mock:
-        parse_mock.return_value.entries = []  # kein echtes Netz, nur kontrollierter Test
-        ds._google_news_rss(query)
+    # WHEN: _google_news_rss baut die URL und ruft sie über die Session (mit Timeout) ab
+    with patch.object(ds._session, "get", return_value=_feed_response(200)) as get_mock:
+        ds._google_news_rss(query)  # kein echtes Netz, nur kontrollierter Test
 
     # THEN: URL muss encoded sein: & -> %26 und Leerzeichen -> +
-    assert parse_mock.called
-    called_url = parse_mock.call_args[0][0]
+    assert get_mock.called
+    called_url = get_mock.call_args[0][0]
     assert "S%26P+500" in called_url
+    assert get_mock.call_args.kwargs["timeout"] == ds._NEWS_TIMEOUT
+
+
+def test_TC_DS_009_get_ticker_data_expired_entry_downloads_only_tail():
+    # GIVEN: Im Cache liegt ein abgelaufener Eintrag für AAPL, der die Periode noch abdeckt
+    wrapper = ds.TickerWrapper(delta_overlap_days=1)
+    cached = _recent_df(30).iloc[:-1]  # letzter Bar fehlt noch
+
+    cache_mock = MagicMock()
+    cache_mock.get.return_value = None
+    cache_mock.get_partial.return_value = None
+    cache_mock.get_stale.return_value = utils.CacheEntry(cached, pd.Timestamp("2020-01-01"), None)
+    wrapper._TickerWrapper__ticker_cache = cache_mock
+
+    delta = _recent_df(2, close_offset=100.0)
+
+    # WHEN: get_ticker_data wird aufgerufen
+    with patch("data_service.yf.download", return_value=delta) as download_mock:
+        data = wrapper.get_ticker_data(["AAPL"], period="1y")
+
+    # THEN: es wird nur ab dem letzten Bar (minus Overlap) geladen, nicht die ganze Periode
+    kwargs = download_mock.call_args.kwargs
+    assert kwargs["start"] == (cached.index.max() - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    assert "period" not in kwargs
+    cache_mock.set_tickers.assert_not_called()
+
+    # UND: die neuen Bars werden mit den gecachten Daten zusammengeführt
+    result = data["AAPL"]
+    assert len(result) == 30
+    assert result["Close"].iloc[-1] == delta["Close"].iloc[-1]
+    assert result["Close"].iloc[0] == cached["Close"].iloc[0]
+    cache_mock.set_ticker.assert_called_once()
+
+
+def test_TC_DS_010_get_ticker_data_failed_tail_download_serves_cached_data():
+    # GIVEN: abgelaufener Eintrag im Cache, yfinance ist nicht erreichbar
+    wrapper = ds.TickerWrapper()
+    cached = _recent_df(30)
+
+    cache_mock = MagicMock()
+    cache_mock.get.return_value = None
+    cache_mock.get_partial.return_value = None
+    cache_mock.get_stale.return_value = utils.CacheEntry(cached, pd.Timestamp("2020-01-01"), None)
+    wrapper._TickerWrapper__ticker_cache = cache_mock
+
+    # WHEN: der Delta-Download schlägt fehl
+    with patch("data_service.yf.download", side_effect=RuntimeError("offline")):
+        data = wrapper.get_ticker_data(["AAPL"], period="1y")
+
+    # THEN: die alten Daten werden weiter ausgeliefert, der Cache bleibt unverändert
+    pd.testing.assert_frame_equal(data["AAPL"], cached)
+    cache_mock.set_ticker.assert_not_called()
+
+
+def test_TC_DS_011_get_ticker_data_wider_period_downloads_only_older_range():
+    # GIVEN: Im (echten) Cache liegen gültige 1mo-Daten für AAPL (Tagesbars für alle Perioden)
+    wrapper = ds.TickerWrapper()
+    recent = _recent_df(40)
+    with patch("data_service.yf.download", return_value=recent):
+        wrapper.get_ticker_data(["AAPL"], period="1mo", interval="1d")
+
+    # WHEN: danach wird eine kürzere und anschließend eine längere Periode angefragt
+    older = _recent_df(120).iloc[:82]  # endet mit Überlappung auf dem ersten gecachten Bar
+    with patch("data_service.yf.download", return_value=older) as download_mock:
+        short = wrapper.get_ticker_data(["AAPL"], period="5d", interval="1d")
+        download_mock.assert_not_called()
+        wide = wrapper.get_ticker_data(["AAPL"], period="3mo", interval="1d")
+
+    # THEN: die kürzere Periode ist ein Ausschnitt aus dem Cache,
+    #       für die längere wird nur der ältere fehlende Bereich geladen
+    assert len(short["AAPL"]) <= 6
+    download_mock.assert_called_once()
+    kwargs = download_mock.call_args.kwargs
+    assert "period" not in kwargs
+    assert kwargs["end"] == (recent.index.min() + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    assert wide["AAPL"].index.is_unique
+    assert wide["AAPL"].index.max() == recent.index.max()
+    assert wide["AAPL"].index.min() < recent.index.min()
+
+    # UND: der Wechsel zurück auf die kürzere Periode kommt weiterhin aus dem Cache
+    with patch("data_service.yf.download") as download_mock:
+        wrapper.get_ticker_data(["AAPL"], period="1mo", interval="1d")
+    download_mock.assert_not_called()
+
+
+def test_TC_DS_012_get_ticker_data_by_dates_served_from_period_cache():
+    # GIVEN: Im Cache liegen 1y-Daten für AAPL aus einer Perioden-Abfrage
+    wrapper = ds.TickerWrapper()
+    recent = _recent_df(300)
+    with patch("data_service.yf.download", return_value=recent):
+        wrapper.get_ticker_data(["AAPL"], period="1y")
+
+    start = recent.index[100]
+    end = recent.index[200]
+
+    # WHEN: ein Datumsbereich innerhalb der gecachten Daten angefragt wird
+    with patch("data_service.yf.download") as download_mock:
+        data = wrapper.get_ticker_data_by_dates(["AAPL"], start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+
+    # THEN: kein Download, der Bereich wird aus dem Cache geschnitten (Ende exklusiv wie bei yfinance)
+    download_mock.assert_not_called()
+    assert data["AAPL"].index.min() == start
+    assert data["AAPL"].index.max() == recent.index[199]
+
+
+def test_TC_DS_013_get_ticker_data_by_dates_downloads_only_gaps():
+    # GIVEN: Im Cache liegt ein Datumsbereich für AAPL
+    wrapper = ds.TickerWrapper()
+    idx = pd.date_range("2024-03-01", "2024-06-30", freq="D")
+    cached = pd.DataFrame({"Close": [1.0] * len(idx)}, index=idx)
+    with patch("data_service.yf.download", return_value=cached):
+        wrapper.get_ticker_data_by_dates(["AAPL"], "2024-03-01", "2024-07-01")
+
+    # WHEN: ein Bereich angefragt wird, der vorne und hinten über die gecachten Daten hinausgeht
+    def _download(tickers, start, end, **_kwargs):
+        rng = pd.date_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), freq="D")
+        return pd.DataFrame({"Close": [2.0] * len(rng)}, index=rng)
+
+    with patch("data_service.yf.download", side_effect=_download) as download_mock:
+        data = wrapper.get_ticker_data_by_dates(["AAPL"], "2024-01-01", "2024-09-01")
+
+    # THEN: es werden nur die beiden Lücken geladen, nicht der ganze Bereich
+    ranges = sorted((c.kwargs["start"], c.kwargs["end"]) for c in download_mock.call_args_list)
+    assert ranges == [("2024-01-01", "2024-03-02"), ("2024-06-28", "2024-09-01")]
+    result = data["AAPL"]
+    assert result.index.min() == pd.Timestamp("2024-01-01")
+    assert result.index.max() == pd.Timestamp("2024-08-31")
+    assert result.index.is_unique
+    assert result.loc[pd.Timestamp("2024-05-01"), "Close"] == 1.0
+
+    # UND: danach liegt der ganze Bereich im Cache
+    with patch("data_service.yf.download") as download_mock:
+        wrapper.get_ticker_data_by_dates(["AAPL"], "2024-02-01", "2024-08-01")
+    download_mock.assert_not_called()
+
+
+def test_TC_DS_014_get_info_and_news_runs_calls_concurrently():
+    # GIVEN: jeder Info- und News-Aufruf dauert 0,2 s
+    import time
+
+    wrapper = ds.TickerWrapper(max_workers=8)
+
+    def _slow_info(ticker):
+        time.sleep(0.2)
+        return {"longName": ticker}
+
+    def _slow_news(ticker, limit=10):
+        time.sleep(0.2)
+        return [{"title": ticker}]
+
+    # WHEN: Info und News für 4 Ticker geladen werden
+    with patch.object(wrapper, "get_info", side_effect=_slow_info), \
+            patch.object(wrapper, "get_news", side_effect=_slow_news):
+        started = time.perf_counter()
+        info, news = wrapper.get_info_and_news(["AAPL", "MSFT", "NVDA", "SAP"])
+        elapsed = time.perf_counter() - started
+
+    # THEN: die Laufzeit entspricht etwa dem langsamsten Einzelaufruf statt der Summe (1,6 s)
+    assert elapsed < 0.8
+    assert info["MSFT"] == {"longName": "MSFT"}
+    assert news["SAP"] == [{"title": "SAP"}]
+
+
+def test_TC_DS_015_get_info_and_news_timeout_returns_empty_results():
+    # GIVEN: der News-Aufruf hängt, der Info-Aufruf schlägt fehl
+    import threading
+
+    wrapper = ds.TickerWrapper()
+    release = threading.Event()
+
+    # WHEN: mit kurzem Timeout geladen wird
+    with patch.object(wrapper, "get_info", side_effect=RuntimeError("boom")), \
+            patch.object(wrapper, "get_news", side_effect=lambda *_a: release.wait(5)):
+        info, news = wrapper.get_info_and_news("AAPL", timeout=0.1)
+    release.set()
+
+    # THEN: leere Ergebnisse statt Blockieren oder Exception
+    assert info == {"AAPL": {}}
+    assert news == {"AAPL": []}
+
+
+def test_TC_DS_016_get_info_cached_and_projected_shared_with_news():
+    # GIVEN: ein Wrapper, der nur ausgewählte Info-Felder cacht
+    wrapper = ds.TickerWrapper(info_fields=["shortName", "currency"])
+
+    ticker_obj = MagicMock()
+    ticker_obj.info = {"shortName": "Apple Inc", "currency": "USD", "longBusinessSummary": "x" * 1000}
+    ticker_obj.news = []
+
+    # WHEN: get_info zweimal und danach get_news (RSS-Fallback braucht den Firmennamen) aufgerufen wird
+    with patch("data_service.yf.Ticker", return_value=ticker_obj) as ticker_mock:
+        first = wrapper.get_info("AAPL")
+        second = wrapper.get_info("AAPL")
+        calls_after_info = ticker_mock.call_count
+        with patch("data_service._google_news_rss", return_value=[]) as rss_mock:
+            wrapper.get_news("AAPL")
+
+    # THEN: yfinance .info wird nur einmal abgefragt, nur die gewünschten Felder bleiben erhalten
+    assert calls_after_info == 1
+    assert first == second == {"shortName": "Apple Inc", "currency": "USD"}
+    # UND: get_news nutzt den Info-Cache (nur noch der .news-Aufruf)
+    assert ticker_mock.call_count == 2
+    # (die RSS-Queries laufen parallel, die Aufrufreihenfolge ist daher nicht festgelegt)
+    assert "Apple Inc stock" in [c[0][0] for c in rss_mock.call_args_list]
+
+
+def _search_response(quotes):
+    response = MagicMock()
+    response.json.return_value = {"quotes": quotes}
+    return response
+
+
+def test_TC_DS_017_search_ticker_uses_session_and_prefix_cache():
+    # GIVEN: eine vollständige (kurze) Trefferliste für "app"
+    ds._search_cache.clear()
+    quotes = [
+        {"symbol": "AAPL", "longname": "Apple Inc.", "quoteType": "EQUITY"},
+        {"symbol": "APP", "longname": "AppLovin Corporation", "quoteType": "EQUITY"},
+        {"symbol": "APPS", "longname": "Digital Turbine, Inc.", "quoteType": "EQUITY"},
+    ]
+
+    # WHEN: der Nutzer "App", "appl" und "apple" tippt
+    with patch.object(ds._session, "get", return_value=_search_response(quotes)) as get_mock:
+        first = ds.search_ticker("App")
+        second = ds.search_ticker("appl")
+        third = ds.search_ticker("apple")
+
+    # THEN: nur ein Request über die Session (mit Timeout), die weiteren werden aus dem Cache gefiltert
+    get_mock.assert_called_once()
+    assert get_mock.call_args.kwargs["timeout"] > 0
+    assert len(first) == 3
+    assert [r[1]["symbol"] for r in second] == ["AAPL", "APP"]
+    assert [r[1]["symbol"] for r in third] == ["AAPL"]
+
+
+def test_TC_DS_018_search_ticker_incomplete_prefix_results_query_again():
+    # GIVEN: für "a" liefert Yahoo die maximale Anzahl Treffer (Liste evtl. unvollständig)
+    ds._search_cache.clear()
+    quotes = [{"symbol": f"A{i}", "longname": f"A {i}", "quoteType": "EQUITY"}
+              for i in range(ds._SEARCH_QUOTES_COUNT)]
+
+    # WHEN: danach "ab" gesucht wird
+    with patch.object(ds._session, "get", return_value=_search_response(quotes)) as get_mock:
+        ds.search_ticker("a")
+        ds.search_ticker("ab")
+
+    # THEN: "ab" kann nicht aus dem Cache beantwortet werden
+    assert get_mock.call_count == 2
+
+
+def test_TC_DS_019_company_search_uses_local_index_before_remote(tmp_path):
+    # GIVEN: ein Wrapper mit lokalem Symbol-Index
+    wrapper = ds.TickerWrapper(symbol_index_path=str(tmp_path / "symbols.json"))
+    remote = [("Apple Inc. (AAPL)", {"name": "Apple Inc.", "symbol": "AAPL"})]
+
+    # WHEN: nach "Apple" und danach nach dem gelernten Symbol gesucht wird
+    with patch("data_service.search_ticker", return_value=remote) as search_mock:
+        first = wrapper.get_company_name_and_symbol("Apple")
+        second = wrapper.get_company_name_and_symbol("aapl")
+
+    # THEN: nur die erste Suche geht ins Netz, das exakte Symbol wird aus dem gelernten Index beantwortet
+    search_mock.assert_called_once()
+    assert first == remote
+    assert second == remote
+
+
+def test_TC_DS_020_concurrent_requests_share_one_download():
+    # GIVEN: 10 Sessions fragen gleichzeitig AAPL an, der Download dauert 0,3 s
+    import threading
+    import time
+
+    wrapper = ds.TickerWrapper()
+    fetched = _recent_df(30)
+
+    def _slow_download(*_args, **_kwargs):
+        time.sleep(0.3)
+        return fetched
+
+    results = []
+    barrier = threading.Barrier(10)
+
+    def _session():
+        barrier.wait()
+        results.append(wrapper.get_ticker_data(["AAPL"], period="1mo")["AAPL"])
+
+    # WHEN: alle Sessions gleichzeitig laden
+    with patch("data_service.yf.download", side_effect=_slow_download) as download_mock:
+        threads = [threading.Thread(target=_session) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    # THEN: nur ein yfinance-Download, alle Sessions erhalten die Daten
+    assert download_mock.call_count == 1
+    assert len(results) == 10
+    assert all(r is not None and len(r) > 0 for r in results)
+    assert wrapper.get_cache_stats()["entries"] == 1
+
+
+def test_TC_DS_021_batch_window_merges_concurrent_misses_into_one_download():
+    # GIVEN: ein Wrapper mit 100 ms Batch-Fenster, zwei Sessions fragen verschiedene Ticker an
+    import threading
+
+    wrapper = ds.TickerWrapper(batch_window_ms=100)
+    idx = pd.date_range(end=pd.Timestamp.today().normalize(), periods=5, freq="D")
+    cols = pd.MultiIndex.from_product([["AAPL", "MSFT"], ["Close"]])
+    fetched = pd.DataFrame([[1.0, 2.0]] * 5, index=idx, columns=cols)
+
+    results = {}
+    barrier = threading.Barrier(2)
+
+    def _session(ticker):
+        barrier.wait()
+        results[ticker] = wrapper.get_ticker_data(ticker, period="5d")[ticker]
+
+    # WHEN: beide Sessions gleichzeitig laden
+    with patch("data_service.yf.download", return_value=fetched) as download_mock:
+        threads = [threading.Thread(target=_session, args=(t,)) for t in ["AAPL", "MSFT"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    # THEN: ein gemeinsamer Download, jede Session erhält ihren Ticker
+    download_mock.assert_called_once()
+    assert sorted(download_mock.call_args[0][0]) == ["AAPL", "MSFT"]
+    assert results["AAPL"]["Close"].iloc[-1] == 1.0
+    assert results["MSFT"]["Close"].iloc[-1] == 2.0
+
+
+def test_TC_DS_022_stale_while_revalidate_returns_expired_data_and_refreshes_in_background():
+    # GIVEN: SWR ist aktiv, im Cache liegt ein seit 5 Minuten abgelaufener Eintrag
+    import threading
+    import time
+    from datetime import datetime, timedelta
+
+    wrapper = ds.TickerWrapper(stale_while_revalidate=True, max_stale_minutes=30)
+    cached = _recent_df(30).iloc[:-1]
+
+    cache_mock = MagicMock()
+    cache_mock.get.return_value = None
+    cache_mock.get_partial.return_value = None
+    cache_mock.get_stale.return_value = utils.CacheEntry(
+        cached, pd.Timestamp("2020-01-01"), datetime.now() - timedelta(minutes=5))
+    wrapper._TickerWrapper__ticker_cache = cache_mock
+
+    downloaded = threading.Event()
+
+    def _download(*_args, **_kwargs):
+        downloaded.set()
+        return _recent_df(2)
+
+    # WHEN: die Daten angefragt werden
+    with patch("data_service.yf.download", side_effect=_download):
+        data = wrapper.get_ticker_data(["AAPL"], period="1y")
+        # THEN: die alten Daten kommen sofort zurück, markiert mit ihrem Alter
+        assert len(data["AAPL"]) == len(cached)
+        assert data["AAPL"].attrs["cache_age_seconds"] >= 300
+        # UND: die Aktualisierung läuft im Hintergrund
+        assert downloaded.wait(timeout=2)
+
+    for _ in range(50):
+        if cache_mock.set_ticker.called:
+            break
+        time.sleep(0.02)
+    cache_mock.set_ticker.assert_called_once()
+
+
+def test_TC_DS_023_stale_while_revalidate_blocks_beyond_max_staleness():
+    # GIVEN: SWR ist aktiv, der Eintrag ist aber älter als die maximale Staleness
+    from datetime import datetime, timedelta
+
+    wrapper = ds.TickerWrapper(stale_while_revalidate=True, max_stale_minutes=30)
+    cached = _recent_df(30).iloc[:-1]
+
+    cache_mock = MagicMock()
+    cache_mock.get.return_value = None
+    cache_mock.get_partial.return_value = None
+    cache_mock.get_stale.return_value = utils.CacheEntry(
+        cached, pd.Timestamp("2020-01-01"), datetime.now() - timedelta(hours=2))
+    wrapper._TickerWrapper__ticker_cache = cache_mock
+
+    # WHEN: die Daten angefragt werden
+    with patch("data_service.yf.download", return_value=_recent_df(2)) as download_mock:
+        data = wrapper.get_ticker_data(["AAPL"], period="1y")
+
+    # THEN: es wird blockierend aktualisiert, die Rückgabe enthält den neuen Bar
+    download_mock.assert_called_once()
+    assert len(data["AAPL"]) == 30
+    assert "cache_age_seconds" not in data["AAPL"].attrs
+
+
+def test_TC_DS_024_refresh_tickers_refreshes_only_expiring_entries():
+    # GIVEN: AAPL läuft in 10 s ab, MSFT ist noch lange gültig, NVDA ist nicht im Cache
+    from datetime import datetime, timedelta
+
+    wrapper = ds.TickerWrapper(ttl_minutes=3, refresh_lead_seconds=30)
+    cache = wrapper._TickerWrapper__ticker_cache
+    now = datetime.now()
+    cache.set_ticker("AAPL", _recent_df(30).iloc[:-1], now - timedelta(days=60), now - timedelta(seconds=170))
+    cache.set_ticker("MSFT", _recent_df(30), now - timedelta(days=60), now)
+
+    # WHEN: der Hintergrund-Refresh läuft
+    with patch("data_service.yf.download", return_value=_recent_df(3)) as download_mock:
+        refreshed = wrapper.refresh_tickers(["AAPL", "MSFT", "NVDA"], "1mo", now=now, interval="1d")
+
+    # THEN: AAPL wird nur am Ende nachgeladen, NVDA komplett, MSFT gar nicht
+    assert sorted(refreshed) == ["AAPL", "NVDA"]
+    requested = [(c.args[0], c.kwargs.get("start"), c.kwargs.get("period")) for c in download_mock.call_args_list]
+    assert (["AAPL"], (_recent_df(30).index[-2] - pd.Timedelta(days=2)).strftime("%Y-%m-%d"), None) in requested
+    assert (["NVDA"], None, "1mo") in requested
+    assert cache.get("AAPL", "1mo", now=now) is not None
+
+
+def test_TC_DS_025_async_wrapper_shares_cache_and_serialises_downloads():
+    # GIVEN: ein asynchroner Wrapper auf dem TickerWrapper-Singleton, yfinance antwortet langsam
+    import asyncio
+    import threading
+    import time
+    from async_data_service import AsyncTickerWrapper
+
+    wrapper = ds.TickerWrapper()
+    async_wrapper = AsyncTickerWrapper(max_workers=4)
+    lock = threading.Lock()
+    active = []
+    overlapping = []
+
+    def _download(tickers, **_kwargs):
+        with lock:
+            active.append(tickers)
+            overlapping.append(len(active))
+        time.sleep(0.1)
+        with lock:
+            active.remove(tickers)
+        return _recent_df(400)
+
+    async def _main():
+        return await asyncio.gather(*(async_wrapper.get_ticker_data([t], period="1y") for t in ["A", "B", "C"]))
+
+    # WHEN: drei Anfragen gleichzeitig über die Event-Loop gestellt werden
+    with patch("data_service.yf.download", side_effect=_download):
+        results = asyncio.run(_main())
+
+    # THEN: die Anfragen laufen im Executor, yf.download selbst aber nie gleichzeitig (globaler Ergebnis-Speicher)
+    assert [list(r) for r in results] == [["A"], ["B"], ["C"]]
+    assert max(overlapping) == 1
+    # UND: der synchrone Wrapper sieht denselben Cache
+    assert wrapper.get_cache_stats()["entries"] == 3
+    asyncio.run(async_wrapper.aclose())
+
+
+def test_TC_DS_026_async_news_fallback_queries_rss_concurrently():
+    # GIVEN: yfinance liefert keine News, httpx ist nicht installiert (Executor-Fallback)
+    import asyncio
+    from async_data_service import AsyncTickerWrapper
+
+    wrapper = ds.TickerWrapper()
+    async_wrapper = AsyncTickerWrapper(wrapper)
+    feeds = {
+        "Apple Inc. stock": [{"title": "A", "link": "a"}, {"title": "B", "link": "b"}],
+        "AAPL stock": [{"title": "B", "link": "b"}, {"title": "C", "link": "c"}],
+    }
+
+    # WHEN: die News asynchron geladen werden
+    with patch("async_data_service.httpx", None), \
+            patch.object(wrapper, "get_info", return_value={"shortName": "Apple Inc."}), \
+            patch("data_service._google_news_rss", side_effect=lambda q, **_kw: feeds[q]) as rss_mock:
+        news = asyncio.run(async_wrapper.get_news("AAPL", limit=10))
+
+    # THEN: beide Queries wurden abgefragt, Duplikate entfernt, Reihenfolge bleibt erhalten
+    assert rss_mock.call_count == 2
+    assert [item["title"] for item in news] == ["A", "B", "C"]
+    asyncio.run(async_wrapper.aclose())
+
+
+def test_TC_DS_027_google_news_rss_cached_with_conditional_requests():
+    # GIVEN: ein Feed mit 30 Einträgen und ETag
+    from types import SimpleNamespace
+
+    entries = [SimpleNamespace(title=f"News {i}", link=f"http://n/{i}") for i in range(30)]
+    responses = [_feed_response(200, etag='"v1"'), _feed_response(304, etag='"v1"')]
+
+    # WHEN: der Feed zweimal innerhalb der TTL und einmal nach Ablauf der TTL abgefragt wird
+    with patch.object(ds._session, "get", side_effect=responses) as get_mock, \
+            patch("data_service.feedparser.parse", return_value=MagicMock(entries=entries)) as parse_mock:
+        first = ds._google_news_rss("TC_DS_027 stock", limit=5)
+        second = ds._google_news_rss("TC_DS_027 stock", limit=25)
+        ds._feed_cache.clear()
+        third = ds._google_news_rss("TC_DS_027 stock", limit=5)
+
+    # THEN: innerhalb der TTL kein zweiter Abruf, nur `limit` Einträge werden umgewandelt
+    assert [item["title"] for item in first] == [f"News {i}" for i in range(5)]
+    assert len(second) == 25
+    # UND: nach der TTL wird bedingt angefragt, ein 304 liefert die bekannten Einträge ohne erneutes Parsen
+    assert get_mock.call_count == 2
+    assert get_mock.call_args_list[1].kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert parse_mock.call_count == 1
+    assert third == first
+
+
+def test_TC_DS_028_get_news_served_from_news_store_within_ttl():
+    # GIVEN: yfinance liefert News
+    wrapper = ds.TickerWrapper(news_ttl_minutes=5)
+    ticker_obj = MagicMock()
+    ticker_obj.news = [{"title": "News 1", "providerPublishTime": 1}, {"title": "News 2", "providerPublishTime": 2}]
+
+    # WHEN: get_news mehrfach (wie bei jedem Dashboard-Rerun) aufgerufen wird
+    with patch("data_service.yf.Ticker", return_value=ticker_obj) as ticker_mock:
+        first = wrapper.get_news("AAPL", limit=10)
+        second = wrapper.get_news("AAPL", limit=1)
+
+    # THEN: yfinance wird nur einmal gefragt, die News kommen neueste zuerst aus dem Store
+    assert ticker_mock.call_count == 1
+    assert [n["title"] for n in first] == ["News 2", "News 1"]
+    assert second == first[:1]
+
+
+def test_TC_DS_029_iter_ticker_data_yields_cache_hits_first_and_others_as_they_complete():
+    # GIVEN: AAPL liegt vollständig im Cache (Kurse, Info, News), die Info von SLOW lädt langsam, FAST schnell
+    import time
+    from datetime import datetime
+
+    wrapper = ds.TickerWrapper()
+    wrapper._TickerWrapper__ticker_cache.set_ticker("AAPL", _recent_df(400), datetime(2000, 1, 1), datetime.now())
+    wrapper._TickerWrapper__info_cache.set("AAPL", {"shortName": "Apple"})
+    wrapper._TickerWrapper__news_store.merge("AAPL", [{"title": "Cached"}])
+
+    fetched = pd.concat({"SLOW": _recent_df(400), "FAST": _recent_df(400)}, axis=1)
+
+    class _Ticker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+            self.news = [{"title": "N"}]
+
+        @property
+        def info(self):
+            if self.symbol == "SLOW":
+                time.sleep(0.3)
+            return {"shortName": "X"}
+
+    # WHEN: die Ergebnisse gestreamt werden
+    with patch("data_service.yf.download", return_value=fetched) as download_mock, \
+            patch("data_service.yf.Ticker", side_effect=_Ticker):
+        results = list(wrapper.iter_ticker_data(["SLOW", "AAPL", "FAST"], period="1y"))
+
+    # THEN: der Cache-Treffer kommt zuerst, danach die Ticker in der Reihenfolge ihrer Fertigstellung
+    assert [r[0] for r in results] == ["AAPL", "FAST", "SLOW"]
+    assert results[0][2] == {"shortName": "Apple"} and results[0][3] == [{"title": "Cached"}]
+    assert all(isinstance(r[1], pd.DataFrame) for r in results)
+    assert results[1][2] == {"shortName": "X"} and results[1][3] == [{"title": "N"}]
+    # UND: die fehlenden Kursdaten kommen mit einem gemeinsamen Download (yf.download ist nicht thread-sicher),
+    #      AAPL wird gar nicht geladen
+    download_mock.assert_called_once()
+    assert sorted(download_mock.call_args.args[0]) == ["FAST", "SLOW"]
+
+
+def test_TC_DS_030_panel_store_returns_aligned_views():
+    # GIVEN: ein Wrapper mit Panel-Store, zwei Ticker mit identischen Handelstagen
+    wrapper = ds.TickerWrapper(panel_store=True)
+    frames = {"AAPL": _recent_df(30), "MSFT": _recent_df(30, close_offset=100.0)}
+    fetched = pd.concat(frames, axis=1)
+
+    # WHEN: die Daten geladen werden
+    with patch("data_service.yf.download", return_value=fetched):
+        data = wrapper.get_ticker_data(["AAPL", "MSFT"], period="1mo")
+
+    # THEN: beide Frames teilen sich den Index, der Vergleich kommt ohne Alignment aus dem Panel
+    assert data["AAPL"].index is data["MSFT"].index
+    assert data["AAPL"].attrs["summary"].matches(data["AAPL"])
+    closes = wrapper.get_panel_frame(["MSFT", "AAPL"])
+    assert list(closes.columns) == ["MSFT", "AAPL"]
+    assert closes["MSFT"].iloc[-1] == data["MSFT"]["Close"].iloc[-1]
+
+
+def test_TC_DS_031_get_ticker_data_selects_interval_per_period():
+    # GIVEN: ein leerer Cache
+    wrapper = ds.TickerWrapper()
+
+    # WHEN: dieselbe Aktie wird für 1 Tag (Intraday) und für 1 Jahr (Tagesbars) angefragt
+    with patch("data_service.yf.download", return_value=_recent_df(3)) as download_mock:
+        wrapper.get_ticker_data(["AAPL"], period="1d")
+        wrapper.get_ticker_data(["AAPL"], period="1y")
+        wrapper.get_ticker_data(["AAPL"], period="1d")
+
+    # THEN: je Intervall genau ein Download mit passendem Intervall und naiven Zeitstempeln,
+    #       der zweite 1d-Abruf kommt aus dem eigenen Cache-Eintrag
+    requested = [(c.kwargs["period"], c.kwargs["interval"]) for c in download_mock.call_args_list]
+    assert requested == [("1d", "5m"), ("1y", "1d")]
+    assert all(c.kwargs["ignore_tz"] for c in download_mock.call_args_list)
+
+    # UND: eine zu lange Periode für ein Intraday-Intervall wird abgelehnt
+    with pytest.raises(ValueError):
+        wrapper.get_ticker_data(["AAPL"], period="1y", interval="5m")
+
+
+def test_TC_DS_032_weekly_bars_derived_from_cached_daily_bars():
+    # GIVEN: Tagesbars für 1 Jahr liegen im Cache
+    wrapper = ds.TickerWrapper()
+    with patch("data_service.yf.download", return_value=_recent_df(400)):
+        wrapper.get_ticker_data(["AAPL"], period="1y")
+
+    # WHEN: dieselbe Periode wird als Wochenbars angefragt
+    with patch("data_service.yf.download") as download_mock:
+        weekly = wrapper.get_ticker_data(["AAPL"], period="6mo", interval="1wk")
+
+    # THEN: kein Download, die Wochenbars sind aus den Tagesbars zusammengefasst
+    download_mock.assert_not_called()
+    df = weekly["AAPL"]
+    assert (df.index.dayofweek == 0).all()
+    assert df["Volume"].iloc[1] == 7 * 1000
+    assert df["High"].max() == _recent_df(400)["High"].max()
+
+
+def test_TC_DS_033_company_search_merges_remote_results_for_prefix_and_fuzzy_matches(tmp_path):
+    # GIVEN: ein lokaler Index, der nur Apple und Microsoft kennt
+    wrapper = ds.TickerWrapper(symbol_index_path=str(tmp_path / "symbols.json"))
+    wrapper._learn_symbols([("Apple Inc. (AAPL)", {"name": "Apple Inc.", "symbol": "AAPL"}),
+                            ("Microsoft Corporation (MSFT)", {"name": "Microsoft Corporation", "symbol": "MSFT"})])
+    remote = [("Micron Technology, Inc. (MU)", {"name": "Micron Technology, Inc.", "symbol": "MU"})]
+
+    # WHEN: nach einem nur unscharf passenden Namen bzw. einem Präfix gesucht wird
+    with patch("data_service.search_ticker", return_value=remote) as search_mock:
+        fuzzy = wrapper.get_company_name_and_symbol("micron")
+        prefix = wrapper.get_company_name_and_symbol("Micro")
+
+    # THEN: die Remote-Suche läuft trotzdem, ihre Treffer stehen vor den lokalen
+    assert search_mock.call_count == 2
+    assert [r[1]["symbol"] for r in prefix] == ["MU", "MSFT"]
+    assert fuzzy[0][1]["symbol"] == "MU"
+
+    # UND: ein exakter Treffer kommt weiterhin nur aus dem lokalen Index
+    with patch("data_service.search_ticker") as search_mock:
+        assert wrapper.get_company_name_and_symbol("MSFT")[0][1]["symbol"] == "MSFT"
+    search_mock.assert_not_called()
+
+
+def test_TC_DS_034_failed_feed_fetch_is_not_cached():
+    # GIVEN: der erste Abruf scheitert (Netzwerkfehler), der zweite mit 503, der dritte liefert den Feed
+    from types import SimpleNamespace
+
+    import requests
+
+    full = MagicMock(entries=[SimpleNamespace(title="News 1", link="http://n/1")])
+    responses = [requests.ConnectionError("offline"), _feed_response(503), _feed_response(200)]
+
+    # WHEN: der Feed dreimal innerhalb der TTL abgefragt wird
+    with patch.object(ds._session, "get", side_effect=responses) as get_mock, \
+            patch("data_service.feedparser.parse", return_value=full):
+        first = ds._google_news_rss("TC_DS_034 stock")
+        second = ds._google_news_rss("TC_DS_034 stock")
+        third = ds._google_news_rss("TC_DS_034 stock")
+
+    # THEN: Fehlschläge werden nicht gecacht, jeder weitere Aufruf fragt erneut an
+    assert first == second == []
+    assert get_mock.call_count == 3
+    assert [item["title"] for item in third] == ["News 1"]
+
+
+def test_TC_DS_035_iter_ticker_data_answers_hung_calls_after_timeout():
+    # GIVEN: die Info von HUNG hängt, alles andere antwortet sofort
+    import threading
+    import time
+
+    wrapper = ds.TickerWrapper()
+    release = threading.Event()
+    fetched = pd.concat({"HUNG": _recent_df(30), "FAST": _recent_df(30)}, axis=1)
+
+    class _Ticker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+            self.news = [{"title": "N"}]
+
+        @property
+        def info(self):
+            if self.symbol == "HUNG":
+                release.wait(5)
+            return {"shortName": "X"}
+
+    # WHEN: die Ergebnisse mit kurzem Timeout gestreamt werden
+    with patch("data_service.yf.download", return_value=fetched), \
+            patch("data_service.yf.Ticker", side_effect=_Ticker):
+        started = time.monotonic()
+        results = {r[0]: r for r in wrapper.iter_ticker_data(["HUNG", "FAST"], period="1mo", timeout=0.3)}
+        elapsed = time.monotonic() - started
+        release.set()
+
+    # THEN: die Seite wartet nicht auf den hängenden Aufruf, HUNG bekommt eine leere Info
+    assert elapsed < 2
+    assert results["FAST"][2] == {"shortName": "X"}
+    assert isinstance(results["HUNG"][1], pd.DataFrame)
+    assert results["HUNG"][2] == {}
+
+
+def test_TC_DS_036_year_performance_computed_from_daily_bars():
+    # GIVEN: Tagesbars ab dem ersten Handelstag des Jahres (Open 100, letzter Close 110)
+    from datetime import datetime
+
+    now = datetime.now()
+    idx = pd.bdate_range(datetime(now.year, 1, 1), periods=max(2, min(20, now.timetuple().tm_yday // 2)))
+    daily = pd.DataFrame({"Open": 100.0, "High": 120.0, "Low": 90.0, "Close": 105.0, "Volume": 1000}, index=idx)
+    daily.iloc[-1, daily.columns.get_loc("Close")] = 110.0
+    wrapper = ds.TickerWrapper()
+
+    # WHEN: die YTD-Performance abgefragt wird, während das Dashboard Wochenbars zeigt
+    with patch("data_service.yf.download", return_value=daily) as download_mock:
+        performance = wrapper.get_year_performance("aapl", now=now)
+
+    # THEN: sie wird aus Tagesbars des laufenden Jahres berechnet, unabhängig vom angezeigten Intervall
+    assert download_mock.call_args.kwargs["interval"] == "1d"
+    assert download_mock.call_args.kwargs["period"] == "ytd"
+    assert performance == pytest.approx(10.0)
+
+
+def test_TC_DS_037_get_ticker_data_by_dates_far_before_cache_downloads_only_range():
+    # GIVEN: Im Cache liegt das letzte Jahr für AAPL
+    wrapper = ds.TickerWrapper()
+    with patch("data_service.yf.download", return_value=_recent_df(400)):
+        wrapper.get_ticker_data(["AAPL"], period="1y")
+
+    # WHEN: ein kleiner Bereich weit vor den gecachten Daten angefragt wird
+    def _download(tickers, start, end, **_kwargs):
+        rng = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+        return pd.DataFrame({"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 1}, index=rng)
+
+    with patch("data_service.yf.download", side_effect=_download) as download_mock:
+        data = wrapper.get_ticker_data_by_dates(["AAPL"], "2010-01-01", "2010-02-01")
+
+    # THEN: nur der angefragte Bereich wird geladen, nicht alle Jahre bis zum Cache
+    download_mock.assert_called_once()
+    assert (download_mock.call_args.kwargs["start"], download_mock.call_args.kwargs["end"]) == \
+        ("2010-01-01", "2010-02-01")
+    assert len(data["AAPL"]) == 21
+
+    # UND: der gecachte Bereich bleibt unverändert zusammenhängend
+    entry = wrapper._TickerWrapper__ticker_cache.get_entry("AAPL")
+    assert entry.data.index.min() == _recent_df(400).index.min()
+
+
+def test_TC_DS_038_panel_store_reuses_rows_and_evicts_with_cache():
+    # GIVEN: ein Wrapper mit Panel-Store und kompaktem Cache (Frames werden beim Lesen mit attrs kopiert)
+    #        und Platz für einen Cache-Eintrag, Info und News liegen im Cache
+    wrapper = ds.TickerWrapper(panel_store=True, compact_cache=True, max_cache_entries=1)
+    panel = wrapper._TickerWrapper__panel
+    wrapper._TickerWrapper__info_cache.set("AAPL", {"shortName": "Apple"})
+    wrapper._TickerWrapper__news_store.merge("AAPL", [{"title": "Cached"}])
+
+    # WHEN: dieselben Daten mehrfach aus dem Cache gelesen werden, auch über iter_ticker_data
+    with patch("data_service.yf.download", return_value=_recent_df(30)):
+        for _ in range(6):
+            wrapper.get_ticker_data(["AAPL"], period="1mo")
+        streamed = list(wrapper.iter_ticker_data(["AAPL"], period="1mo"))
+
+    # THEN: der Panel-Store legt keine neuen Zeilen an und liefert auch Cache-Treffer als Sicht
+    calendar = panel._PanelStore__tickers["AAPL"][0]
+    assert len(calendar.live) == 1 and calendar.rows <= 2
+    assert streamed[0][1].index is panel.get("AAPL").index
+
+    # WHEN: der Eintrag aus dem Cache verdrängt wird
+    with patch("data_service.yf.download", return_value=_recent_df(30)):
+        wrapper.get_ticker_data(["MSFT"], period="1mo")
+
+    # THEN: auch die Panel-Zeile von AAPL ist weg
+    assert panel.get("AAPL") is None
+    assert len(panel) == 1
+
+
+def test_TC_DS_039_one_day_period_keeps_one_session_after_tail_refresh():
+    # GIVEN: der erste 1d-Abruf liefert wie Yahoo genau einen Handelstag mit 5m-Bars
+    import numpy as np
+    from datetime import date, timedelta
+
+    def _session(day, offset=0.0):
+        idx = pd.date_range(f"{day} 09:30", periods=78, freq="5min")
+        values = np.arange(78, dtype=float) + offset
+        return pd.DataFrame({"Open": values, "High": values, "Low": values, "Close": values,
+                             "Volume": np.ones(78, dtype=np.int64)}, index=idx)
+
+    yesterday = date.today() - timedelta(days=1)
+    previous = _session(yesterday - timedelta(days=1))
+    last = _session(yesterday, offset=100.0)
+    wrapper = ds.TickerWrapper()
+
+    with patch("data_service.yf.download", return_value=last):
+        first = wrapper.get_ticker_data(["AAPL"], period="1d")["AAPL"]
+
+    # WHEN: der Eintrag abläuft und der Tail-Refresh mit Überlappung auch den Vortag lädt
+    entry = wrapper._TickerWrapper__ticker_cache.get_entry("AAPL", "5m")
+    entry.timestamp -= timedelta(minutes=10)
+    with patch("data_service.yf.download", return_value=pd.concat([previous, last])) as download_mock:
+        refreshed = wrapper.get_ticker_data(["AAPL"], period="1d")["AAPL"]
+        cached = wrapper.get_ticker_data(["AAPL"], period="1d")["AAPL"]
+
+    # THEN: 1D zeigt jedes Mal nur den letzten Handelstag
+    assert "start" in download_mock.call_args.kwargs
+    assert len(first) == len(refreshed) == len(cached) == 78
+    assert refreshed.index[0] == cached.index[0] == first.index[0]
@@ -0,0 +1,87 @@
+import json
+
+from symbol_index import SymbolIndex
+
+
+def _sample_index(path=None):
+    index = SymbolIndex(path)
+    index.add([
+        {"symbol": "AAPL", "name": "Apple Inc."},
+        {"symbol": "MSFT", "name": "Microsoft Corporation"},
+        {"symbol": "SAP.DE", "name": "SAP SE"},
+        {"symbol": "NVDA", "name": "NVIDIA Corporation"},
+    ])
+    return index
+
+
+def test_TC_SI_001_prefix_search_on_symbol_and_name_words():
+    # GIVEN: ein Index mit einigen Unternehmen
+    index = _sample_index()
+
+    # WHEN / THEN: Präfixe von Symbol, Name und Namensbestandteilen werden gefunden
+    assert [r[1]["symbol"] for r in index.search("aap")] == ["AAPL"]
+    assert [r[1]["symbol"] for r in index.search("Micro")] == ["MSFT"]
+    assert sorted(r[1]["symbol"] for r in index.search("corp")) == ["MSFT", "NVDA"]
+    assert index.search("sap")[0] == ("SAP SE (SAP.DE)", {"name": "SAP SE", "symbol": "SAP.DE"})
+
+
+def test_TC_SI_002_fuzzy_search_tolerates_typos():
+    # GIVEN: ein Index mit einigen Unternehmen
+    index = _sample_index()
+
+    # WHEN: der Name mit Tippfehler gesucht wird
+    result = index.search("Mircosoft")
+
+    # THEN: der Treffer wird über das Trigramm-Ähnlichkeitsmaß gefunden
+    assert result and result[0][1]["symbol"] == "MSFT"
+    assert index.search("xyz") == []
+
+
+def test_TC_SI_003_save_and_load_json(tmp_path):
+    # GIVEN: ein Index mit gelernten Symbolen
+    path = str(tmp_path / "symbols.json")
+    _sample_index(path).save()
+
+    # WHEN: ein neuer Index im Hintergrund aus der Datei geladen wird
+    index = SymbolIndex(path)
+    index.refresh_async().join(timeout=5)
+
+    # THEN: die Symbole sind verfügbar
+    assert len(index) == 4
+    assert len(json.load(open(path, encoding="utf-8"))) == 4
+    assert index.search("nvidia")[0][1]["symbol"] == "NVDA"
+
+
+def test_TC_SI_004_exact_match_only_for_whole_symbols_and_words():
+    # GIVEN: ein Index mit einigen Unternehmen
+    index = _sample_index()
+
+    # WHEN / THEN: ganze Symbole und vollständige Namen sind exakte Treffer, Namensbestandteile, Präfixe
+    #              und Tippfehler nicht (dort könnte ein noch unbekanntes Unternehmen gemeint sein)
+    assert index.has_exact_match("aapl")
+    assert index.has_exact_match("Apple Inc.")
+    assert index.has_exact_match("microsoft corporation")
+    assert not index.has_exact_match("Apple")
+    assert not index.has_exact_match("corporation")
+    assert not index.has_exact_match("Micro")
+    assert not index.has_exact_match("micron")
+    assert not index.has_exact_match("")
+
+
+def test_TC_SI_005_concurrent_saves_keep_the_file_valid(tmp_path):
+    # GIVEN: ein Index, der von mehreren Suchen gleichzeitig gespeichert wird
+    import threading
+
+    path = str(tmp_path / "symbols.json")
+    indices = [_sample_index(path) for _ in range(8)]
+
+    # WHEN: alle gleichzeitig speichern
+    threads = [threading.Thread(target=index.save) for index in indices]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # THEN: die Datei ist gültiges JSON, temporäre Dateien bleiben nicht zurück
+    assert len(json.load(open(path, encoding="utf-8"))) == 4
+    assert [p.name for p in tmp_path.iterdir()] == ["symbols.json"]
@@ -124,4 +124,252 @@ def test_TC_TU_010_missing_columns():
     """Negative Test: Wie reagiert das System auf unvollständige Daten?"""
     df_empty = pd.DataFrame({'Open': [1, 2]})
     with pytest.raises(KeyError):
-        tu.get_latest_close(df_empty)
\ No newline at end of file
+        tu.get_latest_close(df_empty)
+
+def test_TC_TU_021_merge_history_frames(sample_stock_data):
+    """Prüft, ob neue Bars die überlappenden Bars ersetzen und alte Bars erhalten bleiben."""
+    update = pd.DataFrame(
+        {'Close': [111.0, 120.0], 'High': [113.0, 121.0], 'Low': [109.0, 118.0]},
+        index=pd.date_range(start="2025-01-05", periods=2, freq="D")
+    )
+    merged = tu.merge_history_frames(sample_stock_data, update)
+
+    assert len(merged) == 6
+    assert merged.index.is_monotonic_increasing
+    assert merged.loc[pd.Timestamp("2025-01-04"), 'Close'] == 110.0
+    assert merged.loc[pd.Timestamp("2025-01-05"), 'Close'] == 111.0
+    assert merged.loc[pd.Timestamp("2025-01-06"), 'Close'] == 120.0
+    assert tu.merge_history_frames(sample_stock_data, None) is sample_stock_data
+
+
+def test_TC_TU_011_build_comparison_frame_percent_and_memo():
+    """Prüft Ausrichtung, prozentuale Normierung auf den ersten gültigen Wert und die Memoisierung."""
+    a = pd.DataFrame({'Close': [100.0, 110.0, 120.0]}, index=pd.date_range("2025-01-01", periods=3, freq="D"))
+    b = pd.DataFrame({'Close': [50.0, 25.0]}, index=pd.date_range("2025-01-02", periods=2, freq="D"))
+    data = {"A": a, "B": b, "C": None}
+
+    absolute = tu.build_comparison_frame(data, ["A", "B", "C"])
+    assert list(absolute.columns) == ["A", "B"]
+    assert len(absolute) == 3
+    assert np.isnan(absolute.loc[pd.Timestamp("2025-01-01"), "B"])
+
+    percent = tu.build_comparison_frame(data, ["A", "B", "C"], percent=True)
+    assert percent.loc[pd.Timestamp("2025-01-03"), "A"] == pytest.approx(20.0)
+    # Basis für B ist der erste verfügbare Wert am 02.01.
+    assert percent.loc[pd.Timestamp("2025-01-02"), "B"] == pytest.approx(0.0)
+    assert percent.loc[pd.Timestamp("2025-01-03"), "B"] == pytest.approx(-50.0)
+
+    # Gleiche Ticker, gleicher Zeitraum, gleicher Modus -> gleiches Ergebnis-Objekt
+    assert tu.build_comparison_frame(data, ["A", "B"], percent=True) is percent
+    assert tu.build_comparison_frame({}, ["A"]).empty
+
+
+def test_TC_TU_012_downsample_lttb_keeps_extremes_and_budget():
+    """Prüft, ob LTTB das Punktbudget einhält und Ausreißer sowie erste/letzte Punkte behält."""
+    idx = pd.date_range("2015-01-01", periods=2500, freq="D")
+    values = np.sin(np.linspace(0, 20, 2500))
+    values[1234] = 10.0  # deutlicher Ausreißer muss sichtbar bleiben
+    frame = pd.DataFrame({"A": values, "B": values * 2}, index=idx)
+    frame.iloc[:100, 1] = np.nan  # B startet später
+
+    result = tu.downsample_lttb(frame, max_points=500)
+
+    assert len(result) <= 500
+    assert result.index.is_monotonic_increasing
+    assert idx[0] in result.index and idx[-1] in result.index and idx[100] in result.index
+    assert idx[1234] in result.index
+    # Kleine Frames bleiben unverändert
+    assert len(tu.downsample_lttb(frame.iloc[:10], max_points=500)) == 10
+
+
+def test_TC_TU_013_downsample_ohlc_aggregates_buckets():
+    """Prüft die OHLC-Aggregation je Bucket (erstes Open, max High, min Low, letztes Close, Summe Volume)."""
+    idx = pd.date_range("2025-01-01", periods=6, freq="D")
+    frame = pd.DataFrame({
+        'Open': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        'High': [5.0, 9.0, 4.0, 7.0, 8.0, 6.0],
+        'Low': [0.5, 1.0, 0.1, 3.0, 2.0, 4.0],
+        'Close': [2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+        'Volume': [10, 20, 30, 40, 50, 60],
+    }, index=idx)
+
+    result = tu.downsample_ohlc(frame, max_points=2)
+
+    assert list(result.index) == [idx[0], idx[3]]
+    assert result.iloc[0].tolist() == [1.0, 9.0, 0.1, 4.0, 60]
+    assert result.iloc[1].tolist() == [4.0, 8.0, 2.0, 7.0, 150]
+
+
+def test_TC_TU_014_summary_matches_single_getters_and_extends_incrementally():
+    """Prüft, ob die Kennzahlen-Zusammenfassung den Einzelfunktionen entspricht und beim Anhängen
+    neuer Bars nur inkrementell (ohne kompletten Scan) fortgeschrieben wird."""
+    idx = pd.date_range("2024-12-28", periods=10, freq="D")
+    base = pd.DataFrame({
+        'Open': np.arange(10, dtype=float) + 100,
+        'High': [105, 120, 104, 103, 102, 101, 100, 99, 98, 97.0],
+        'Low': [95, 94, 93, 80, 92, 91, 90, 89, 88, 87.0],
+        'Close': np.arange(10, dtype=float) + 101,
+    }, index=idx)
+
+    summary = tu.get_summary(base)
+    assert summary.latest_close == tu.get_latest_close(base)
+    assert (summary.high, summary.high_date) == tu.get_high_market_price(base)
+    assert (summary.low, summary.low_date) == tu.get_low_market_price(base)
+    assert summary.get_interval_text() == tu.get_interval_text(base)
+    # erstes Open des Jahres der letzten Bar (2025-01-01)
+    assert summary.year == 2025 and summary.year_open == 104.0
+    assert tu.get_summary(base) is summary
+
+    # WHEN: neue Bars (mit 1 Tag Überlappung) angehängt werden
+    update = pd.DataFrame({'Open': [1.0, 2.0], 'High': [130.0, 96.0], 'Low': [86.0, 85.0], 'Close': [111.0, 112.0]},
+                          index=pd.date_range(idx[-1], periods=2, freq="D"))
+    with patch("ticker_utils.summarize_history_frame") as full_scan:
+        merged = tu.merge_history_frames(base, update)
+        extended = tu.get_summary(merged)
+
+    # THEN: kein vollständiger Scan, Ergebnis identisch zur Neuberechnung
+    full_scan.assert_not_called()
+    expected = tu.summarize_history_frame(merged)
+    assert vars(extended) == vars(expected)
+    assert extended.high == 130.0 and extended.low == 80.0 and extended.rows == 11
+
+
+def test_TC_TU_015_min_date_is_memoised_and_logged_instead_of_printed(capsys, caplog):
+    """Prüft, ob die Perioden-Berechnung nichts mehr auf stdout schreibt und pro Tag nur einmal rechnet."""
+    import logging
+
+    # Kein anderer Test darf das Ergebnis bereits gemerkt haben
+    day = datetime(2031, 3, 31, 9, 15)
+    with caplog.at_level(logging.DEBUG, logger="ticker_utils"):
+        first = tu.get_min_date_in_period_from_now("1mo", day)
+        second = tu.get_min_date_in_period_from_now("1mo", day.replace(hour=17))
+
+    assert first == second == datetime(2031, 2, 28)
+    assert capsys.readouterr().out == ""
+    # Nur der erste Aufruf wird berechnet (und protokolliert), der zweite kommt aus dem Memo
+    assert [r.getMessage() for r in caplog.records] == ["found period 1mo for 1mo"]
+
+
+def test_TC_TU_016_comparison_frame_shared_index_fast_path_matches_concat():
+    """Prüft, ob Frames mit gemeinsamem Index-Objekt ohne Alignment dasselbe Ergebnis liefern wie über concat."""
+    idx = pd.date_range("2025-01-01", periods=5, freq="D")
+    shared = {
+        "A": pd.DataFrame({"Close": [1.0, 2.0, np.nan, 4.0, 5.0]}, index=idx),
+        "B": pd.DataFrame({"Close": [np.nan, 20.0, 30.0, 40.0, 50.0]}, index=idx),
+    }
+    separate = {t: df.set_index(df.index.copy()) for t, df in shared.items()}
+    assert shared["A"].index is shared["B"].index
+
+    for percent in (False, True):
+        # Memo leeren, sonst käme das zweite Ergebnis aus dem Cache des ersten
+        getattr(tu, "__comparison_cache").clear()
+        fast = tu.build_comparison_frame(shared, ["B", "A"], percent=percent)
+        getattr(tu, "__comparison_cache").clear()
+        slow = tu.build_comparison_frame(separate, ["B", "A"], percent=percent)
+        pd.testing.assert_frame_equal(fast, slow, check_freq=False)
+
+
+def test_TC_TU_017_interval_selected_per_period_and_validated():
+    """Prüft, ob pro Periode ein passendes Intervall gewählt wird und zu lange Intraday-Perioden abgelehnt werden."""
+    assert tu.get_suitable_interval("1d") == "5m"
+    assert tu.get_suitable_interval("7d") == "1h"   # nächstgrößere Periode 1mo
+    assert tu.get_suitable_interval("1y") == "1d"
+    assert tu.get_suitable_interval("5y") == "1wk"
+    assert tu.get_suitable_interval(None) == "1d"
+
+    # Intraday-Intervalle nur innerhalb der Yahoo-Grenzen (5m: 60 Tage, 1h: 730 Tage)
+    assert tu.get_next_suitable_period("1mo", "5m") == "1mo"
+    assert tu.get_next_suitable_period("1y", "1h") == "1y"
+    assert tu.get_next_suitable_period("10y", "1wk") == "10y"
+    with pytest.raises(ValueError):
+        tu.get_next_suitable_period("1y", "5m")
+    with pytest.raises(ValueError):
+        tu.get_next_suitable_period("2y", "1h")
+
+
+def test_TC_TU_018_resample_history_frame_aggregates_ohlcv_per_week():
+    """Prüft, ob Tagesbars zu Wochenbars (Montag als Label) mit first/max/min/last/sum zusammengefasst werden."""
+    idx = pd.bdate_range("2025-01-01", periods=8)  # Mi 01.01. bis Fr 10.01.
+    values = np.arange(8, dtype=float)
+    df = pd.DataFrame({"Open": values, "High": values + 1, "Low": values - 1, "Close": values + 0.5,
+                       "Volume": np.full(8, 10, dtype=np.int64)}, index=idx)
+
+    weekly = tu.resample_history_frame(df, "1wk")
+
+    assert list(weekly.index) == [pd.Timestamp("2024-12-30"), pd.Timestamp("2025-01-06")]
+    assert weekly.iloc[0].tolist() == [0.0, 3.0, -1.0, 2.5, 30]
+    assert weekly.iloc[1].tolist() == [3.0, 8.0, 2.0, 7.5, 50]
+    assert weekly["Volume"].dtype == np.int64
+
+    # Nur aus feineren Intervallen ableitbar, Monate nicht aus Wochen
+    assert tu.get_resample_sources("1wk")[-1] == "1d"
+    assert "1wk" not in tu.get_resample_sources("1mo")
+    assert tu.get_resample_sources("1m") == ()
+    with pytest.raises(ValueError):
+        tu.resample_history_frame(df, "5d")
+
+
+def test_TC_TU_019_comparison_frame_memo_is_thread_safe():
+    """Prüft, ob viele Sessions gleichzeitig Vergleiche berechnen können, ohne dass das Memo einen Fehler wirft."""
+    import threading
+
+    idx = pd.date_range("2025-01-01", periods=20, freq="D")
+    frames = [{"A": pd.DataFrame({"Close": np.arange(20.0) + i}, index=idx)} for i in range(64)]
+    errors = []
+
+    def _compare(offset):
+        try:
+            for n in range(200):
+                data = frames[(offset + n) % len(frames)]
+                tu.build_comparison_frame(data, ["A"], percent=bool(n % 2))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=_compare, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(getattr(tu, "__comparison_cache")) <= 32
+
+
+def test_TC_TU_020_intraday_bars_derived_from_session_open():
+    """Prüft, ob abgeleitete Stundenbars wie bei Yahoo zur Eröffnung (09:30, 10:30, ...) beginnen."""
+    idx = pd.date_range("2025-10-16 09:30", periods=78, freq="5min").append(
+        pd.date_range("2025-10-17 09:30", periods=78, freq="5min"))
+    values = np.arange(156, dtype=float)
+    df = pd.DataFrame({"Open": values, "High": values + 1, "Low": values - 1, "Close": values,
+                       "Volume": np.ones(156, dtype=np.int64)}, index=idx)
+
+    hourly = tu.resample_history_frame(df, "1h")
+
+    # 6 volle Stunden plus die halbe Stunde bis 16:00 pro Handelstag
+    assert len(hourly) == 14
+    assert hourly.index[0] == pd.Timestamp("2025-10-16 09:30")
+    assert hourly.index[7] == pd.Timestamp("2025-10-17 09:30")
+    assert hourly["Volume"].tolist()[:7] == [12, 12, 12, 12, 12, 12, 6]
+    assert hourly.iloc[0][["Open", "High", "Low", "Close"]].tolist() == [0.0, 12.0, -1.0, 11.0]
+
+    # 60m ist nur ein anderer Name für 1h und wird nicht zusätzlich als Quelle angeboten
+    assert "60m" not in tu.get_resample_sources("1d")
+    assert "1h" in tu.get_resample_sources("1d")
+
+
+def test_TC_TU_022_day_periods_counted_in_trading_sessions():
+    """Prüft, ob 1d und 5d wie beim Download in Handelstagen der Daten gezählt werden, auch über Wochenenden."""
+    days = ["2025-10-09", "2025-10-10", "2025-10-13", "2025-10-14", "2025-10-15", "2025-10-16", "2025-10-17"]
+    idx = pd.DatetimeIndex([]).append([pd.date_range(f"{day} 09:30", periods=78, freq="5min") for day in days])
+    df = pd.DataFrame({"Close": np.arange(len(idx), dtype=float)}, index=idx)
+    now = datetime(2025, 10, 19, 12, 0)
+
+    # 1d beginnt mit dem letzten Handelstag, nicht einen Kalendertag davor
+    assert tu.get_period_start(df, "1d", now) == datetime(2025, 10, 17)
+    assert len(tu.slice_history_frame(df, tu.get_period_start(df, "1d", now))) == 78
+    # 5d umfasst fünf Handelstage über das Wochenende hinweg
+    assert tu.get_period_start(df, "5d", now) == datetime(2025, 10, 13)
+    # Weniger Handelstage als die Periode: alles
+    assert tu.get_period_start(df.iloc[:78], "5d", now) == datetime(2025, 10, 9)
+    # Längere Perioden bleiben kalenderbasiert
+    assert tu.get_period_start(df, "1mo", now) == datetime(2025, 9, 17)
@@ -1,3 +1,4 @@
+import os
 import pytest
 from datetime import datetime, timedelta
 from utils import Singleton, TickerCache
@@ -81,4 +82,402 @@ def test_TC_U_005_cache_miss_restrictive_date():
     # Da 2023 vor 2024 liegt, fehlen dem Cache Daten -> Cache Miss
     result = cache.get("TSLA", "2y", now=now)
 
-    assert result is None
\ No newline at end of file
+    assert result is None
+
+def test_TC_U_006_cache_get_stale_returns_expired_entry():
+    """Prüft, ob abgelaufene Einträge für einen Delta-Refresh weiterhin abrufbar sind."""
+    cache = TickerCache(ttl_minutes=1)
+    start_time = datetime(2025, 1, 1, 12, 0)
+    cache.set_ticker("MSFT", "Data2024", datetime(2023, 1, 1), start_time)
+
+    # Innerhalb der TTL gibt es keinen abgelaufenen Eintrag
+    assert cache.get_stale("MSFT", "1y", now=start_time) is None
+
+    future_time = start_time + timedelta(minutes=2)
+    entry = cache.get_stale("MSFT", "1y", now=future_time)
+    assert entry is not None
+    assert entry.data == "Data2024"
+
+    # Deckt der Eintrag die Periode nicht ab, wird nichts geliefert
+    assert cache.get_stale("MSFT", "5y", now=future_time) is None
+
+
+def test_TC_U_007_cache_keeps_widest_range_and_slices():
+    """Prüft, ob kürzere Perioden als Ausschnitt geliefert werden und den breiten Eintrag nicht überschreiben."""
+    import pandas as pd
+
+    cache = TickerCache(ttl_minutes=5)
+    now = datetime(2025, 6, 30, 12, 0)
+    idx = pd.date_range(end="2025-06-30", periods=400, freq="D")
+    wide = pd.DataFrame({"Close": range(400)}, index=idx)
+    cache.set_ticker("AAPL", wide, datetime(2024, 5, 1), now)
+
+    # Kürzere Periode: Ausschnitt ab dem berechneten Startdatum
+    result = cache.get("AAPL", "1mo", now=now)
+    assert result.index.min() == pd.Timestamp("2025-05-30")
+    assert result.index.max() == pd.Timestamp("2025-06-30")
+
+    # Ein schmalerer, überlappender Eintrag wird zusammengeführt statt den breiten zu ersetzen
+    narrow = pd.DataFrame({"Close": [-1, -2]}, index=pd.date_range(end="2025-06-30", periods=2, freq="D"))
+    cache.set_ticker("AAPL", narrow, datetime(2025, 6, 29), now)
+    result = cache.get("AAPL", "1y", now=now)
+    assert result is not None
+    assert result["Close"].iloc[-1] == -2
+    assert cache.get("AAPL", "2y", now=now) is None
+
+
+def test_TC_U_008_cache_warm_start_from_persistent_store(tmp_path):
+    """Prüft, ob ein neuer Cache (z.B. nach Neustart) Einträge aus dem persistenten Speicher lädt."""
+    import pandas as pd
+    from utils import TickerStore
+
+    pytest.importorskip("pyarrow")
+
+    now = datetime(2025, 6, 30, 12, 0)
+    idx = pd.date_range(end="2025-06-30", periods=10, freq="D", name="Date")
+    df = pd.DataFrame({"Close": [float(i) for i in range(10)], "Volume": list(range(10))}, index=idx)
+
+    cache = TickerCache(ttl_minutes=5, store=TickerStore(str(tmp_path)))
+    cache.set_ticker("^GSPC", df, datetime(2025, 6, 21), now)
+
+    # Neuer Cache mit leerem Speicher, aber gleichem Verzeichnis
+    warm = TickerCache(ttl_minutes=5, store=TickerStore(str(tmp_path)))
+    entry = warm.get_entry("^GSPC")
+
+    assert entry is not None
+    pd.testing.assert_frame_equal(entry.data, df, check_freq=False)
+    assert entry.min_date == datetime(2025, 6, 21)
+    assert entry.timestamp == now
+
+    # Ablauf der TTL bleibt erhalten: nach Neustart wird nur noch der Rest nachgeladen
+    assert warm.get_stale("^GSPC", "5d", now=now + timedelta(minutes=10)) is not None
+
+    warm.clear_ticker("^GSPC")
+    assert TickerCache(store=TickerStore(str(tmp_path))).get_entry("^GSPC") is None
+
+
+def test_TC_U_009_cache_lru_eviction_and_counters():
+    """Prüft die LRU-Verdrängung bei voller Kapazität sowie die Hit/Miss/Eviction-Zähler."""
+    cache = TickerCache(ttl_minutes=5, max_entries=2)
+    now = datetime(2025, 1, 10, 12, 0)
+    cache.set_ticker("AAPL", "A", datetime(2024, 1, 1), now)
+    cache.set_ticker("MSFT", "M", datetime(2024, 1, 1), now)
+
+    # AAPL wird benutzt -> MSFT ist nun am längsten unbenutzt
+    assert cache.get("AAPL", "1y", now=now) == "A"
+    cache.set_ticker("NVDA", "N", datetime(2024, 1, 1), now)
+
+    assert cache.get("MSFT", "1y", now=now) is None
+    assert cache.get("NVDA", "1y", now=now) == "N"
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_TC_U_010_cache_byte_budget_and_purge_expired():
+    """Prüft das Speicherbudget (DataFrame memory_usage) und das Entfernen lange abgelaufener Einträge."""
+    import pandas as pd
+
+    df = pd.DataFrame({"Close": [1.0] * 100}, index=pd.date_range("2025-01-01", periods=100, freq="D"))
+    one_entry = int(df.memory_usage(index=True).sum())
+
+    cache = TickerCache(ttl_minutes=1, max_bytes=one_entry * 2, retention_minutes=10)
+    now = datetime(2025, 6, 1, 12, 0)
+    for ticker in ["A", "B", "C"]:
+        cache.set_ticker(ticker, df, datetime(2025, 1, 1), now)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == one_entry * 2
+
+    # Innerhalb der Retention bleiben abgelaufene Einträge für den Delta-Refresh erhalten
+    cache.purge_expired(now + timedelta(minutes=5))
+    assert cache.stats()["entries"] == 2
+    cache.purge_expired(now + timedelta(minutes=12))
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["expirations"] == 2
+
+
+def test_TC_U_011_single_flight_shares_result_and_error():
+    """Prüft, ob wartende Aufrufer das Ergebnis bzw. den Fehler des laufenden Aufrufs erhalten."""
+    from utils import SingleFlight
+
+    flight = SingleFlight()
+    owned, pending = flight.claim(["A", "B"])
+    assert owned == ["A", "B"] and pending == {}
+
+    # Zweiter Aufrufer wartet auf A und B, übernimmt aber C selbst
+    owned2, pending2 = flight.claim(["A", "B", "C"])
+    assert owned2 == ["C"]
+    flight.resolve("A", "result-A")
+    flight.resolve("B", error=RuntimeError("failed"))
+    assert pending2["A"].result(timeout=1) == "result-A"
+    with pytest.raises(RuntimeError):
+        pending2["B"].result(timeout=1)
+
+    # Nach dem Auflösen ist der Schlüssel wieder frei
+    assert flight.do("A", lambda: "new") == "new"
+
+
+def test_TC_U_012_refresher_respects_trading_hours_and_watch_time():
+    """Prüft, ob nur beobachtete Ticker und nur während der Handelszeiten aktualisiert werden."""
+    from unittest.mock import MagicMock
+    from utils import TickerRefresher
+
+    refresh = MagicMock()
+    refresher = TickerRefresher(refresh, watch_minutes=30)
+    monday = datetime(2025, 6, 2, 15, 0)
+    refresher.watch(["AAPL", "MSFT"], "1y", now=monday)
+    refresher.watch(["SAP.DE"], "3mo", now=monday - timedelta(hours=1))
+
+    # Wochenende (Sonntag davor): kein Refresh
+    assert refresher.run_once(datetime(2025, 6, 1, 15, 0)) == {}
+    refresh.assert_not_called()
+
+    # Montag während der Handelszeit: nur die zuletzt angefragten Ticker
+    assert refresher.run_once(monday + timedelta(minutes=1)) == {"1y": ["AAPL", "MSFT"]}
+    refresh.assert_called_once_with(["AAPL", "MSFT"], "1y", monday + timedelta(minutes=1))
+
+    # Nach Ablauf der Beobachtungszeit wird nichts mehr aktualisiert
+    assert refresher.watched(monday + timedelta(hours=2)) == {}
+
+
+def test_TC_U_013_cache_slice_carries_memoised_summary():
+    """Prüft, ob Cache-Treffer die Kennzahlen des jeweiligen Zeitraums mitliefern, ohne sie neu zu berechnen."""
+    import pandas as pd
+    from unittest.mock import patch
+
+    cache = TickerCache(ttl_minutes=5)
+    now = datetime.now()
+    idx = pd.date_range(end=now, periods=60, freq="D").normalize()
+    df = pd.DataFrame({"Open": 1.0, "High": range(60), "Low": range(60), "Close": range(60)}, index=idx, dtype=float)
+    cache.set_ticker("AAPL", df, idx[0], now)
+
+    first = cache.get("AAPL", "1mo", now)
+    assert first.attrs["summary"].matches(first)
+    assert first.attrs["summary"].high == first["High"].max()
+    assert first.attrs["summary"].low == first["Low"].min()
+
+    # Zweiter Abruf desselben Zeitraums nutzt die gemerkte Zusammenfassung
+    with patch("ticker_utils.summarize_history_frame") as full_scan:
+        second = cache.get("AAPL", "1mo", now)
+    full_scan.assert_not_called()
+    assert second.attrs["summary"] is first.attrs["summary"]
+
+
+def test_TC_U_014_news_store_merges_deduplicated_time_sorted_ring_buffer():
+    """Prüft, ob der News-Store Duplikate verwirft, nach Zeit sortiert, alte News verdrängt und abläuft."""
+    from utils import NewsStore
+
+    store = NewsStore(ttl_minutes=5, max_items=3)
+    now = datetime(2025, 6, 2, 12, 0)
+    store.merge("AAPL", [
+        {"title": "B", "link": "b", "publisherPublishTime": 200},
+        {"title": "A", "link": "a", "publisherPublishTime": 100},
+    ], now)
+    # yfinance-Format (verschachtelt) und ein Duplikat aus dem RSS-Fallback
+    store.merge("AAPL", [
+        {"id": "c", "content": {"title": "C", "pubDate": "1970-01-01T00:05:00Z"}},
+        {"title": "B", "link": "b", "publisherPublishTime": 200},
+        {"title": "D", "link": "d", "publisherPublishTime": 50},
+    ], now)
+
+    # C (300) > B (200) > A (100), D ist die älteste und fällt aus dem Ring-Puffer
+    assert [(n.get("content") or n)["title"] for n in store.get("AAPL", 10, now)] == ["C", "B", "A"]
+    assert len(store.get("AAPL", 2, now)) == 2
+    assert store.get("MSFT", 10, now) is None
+    # Nach Ablauf der TTL muss neu geladen werden
+    assert store.get("AAPL", 10, now + timedelta(minutes=5)) is None
+
+
+def test_TC_U_015_compact_cache_halves_memory_and_restores_dtypes():
+    """Prüft, ob der kompakte Cache weniger als die Hälfte Speicher braucht, den Index teilt
+    und an der API-Grenze wieder die ursprünglichen Datentypen und Werte liefert."""
+    import numpy as np
+    import pandas as pd
+
+    now = datetime.now()
+    idx = pd.date_range(end=now, periods=500, freq="D").normalize()
+    prices = np.round(np.linspace(100, 250, 500), 2)
+    frames = {
+        t: pd.DataFrame({"Open": prices, "High": prices + 1, "Low": prices - 1, "Close": prices + offset,
+                         "Adj Close": prices, "Volume": np.arange(500, dtype=np.int64) * 1000}, index=idx.copy())
+        for offset, t in enumerate(["AAPL", "MSFT"])
+    }
+
+    plain = TickerCache(ttl_minutes=5)
+    compact = TickerCache(ttl_minutes=5, compact=True)
+    for t, df in frames.items():
+        plain.set_ticker(t, df, idx[0], now)
+        compact.set_ticker(t, df, idx[0], now)
+
+    # Speicher pro Ticker mindestens halbiert, gleiche Handelstage teilen sich ein Index-Objekt
+    assert compact.stats()["bytes"] <= plain.stats()["bytes"] / 2
+    assert compact.get_entry("AAPL").data.index is compact.get_entry("MSFT").data.index
+    assert compact.get_entry("AAPL").data["Close"].dtype == np.float32
+
+    # An der API-Grenze: ursprüngliche Datentypen und (auf 2 Nachkommastellen gerundete) Werte
+    result = compact.get("MSFT", "1y", now)
+    expected = plain.get("MSFT", "1y", now)
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.attrs["summary"].matches(result)
+
+
+def test_TC_U_016_panel_store_hands_out_views_and_aligns_by_arrays():
+    """Prüft, ob der Panel-Store Sichten ohne Kopie liefert, Indizes teilt, alte Sichten bei Updates
+    unverändert lässt und Ticker unterschiedlicher Länge per Array-Operation ausrichtet."""
+    import numpy as np
+    import pandas as pd
+    from utils import PanelStore
+
+    idx = pd.date_range("2025-01-01", periods=10, freq="D")
+    aapl = pd.DataFrame({"Close": np.arange(10.0), "Volume": np.arange(10)}, index=idx)
+    msft = pd.DataFrame({"Close": np.arange(10.0) + 100, "Volume": np.arange(10)}, index=idx)
+    nvda = pd.DataFrame({"Close": np.arange(4.0) + 50, "Volume": np.arange(4)}, index=idx[6:])
+
+    store = PanelStore()
+    view_aapl = store.set("AAPL", aapl)
+    view_msft = store.set("MSFT", msft)
+    store.set("NVDA", nvda)
+
+    # Gleicher Kalender und Zeitraum -> ein gemeinsames Index-Objekt, Werte sind schreibgeschützte Sichten
+    assert view_aapl.index is view_msft.index
+    pd.testing.assert_frame_equal(view_aapl, aapl, check_freq=False)
+    with pytest.raises(ValueError):
+        view_aapl["Close"].to_numpy()[0] = 1.0
+
+    # Update: neue Zeile, die alte Sicht bleibt unverändert
+    store.set("AAPL", aapl * 2)
+    assert view_aapl["Close"].iloc[-1] == 9.0
+    assert store.get("AAPL")["Close"].iloc[-1] == 18.0
+
+    # Ausrichtung über Array-Operationen, NaN außerhalb des Zeitraums eines Tickers
+    frame = store.frame(["NVDA", "AAPL"])
+    assert list(frame.columns) == ["NVDA", "AAPL"]
+    assert frame["NVDA"].isna().sum() == 6
+    assert frame["AAPL"].iloc[-1] == 18.0
+
+    # Viele Updates: tote Zeilen werden verdichtet, die Daten bleiben korrekt
+    for i in range(20):
+        store.set("MSFT", msft + i)
+    assert store.get("MSFT")["Close"].iloc[0] == 119.0
+    assert store.get("NVDA")["Close"].iloc[0] == 50.0
+
+
+def test_TC_U_017_cache_keys_and_ttls_per_interval():
+    """Prüft, ob Tages- und Intraday-Daten getrennt gecacht werden und jedes Intervall seine eigene TTL hat."""
+    cache = TickerCache(ttl_minutes=5, interval_ttl_minutes={"5m": 1}, interval_retention_minutes={"5m": 2})
+    now = datetime.now()
+    cache.set_ticker("AAPL", {"price": 100}, datetime(2024, 1, 1), now - timedelta(minutes=3))
+    cache.set_ticker("AAPL", {"price": 101}, datetime(2024, 1, 1), now - timedelta(minutes=3), interval="5m")
+
+    # Tagesdaten (TTL 5 min) noch gültig, 5m-Daten (TTL 1 min) abgelaufen, aber noch für Delta-Refresh da
+    assert cache.get("AAPL", "1d", now) == {"price": 100}
+    assert cache.get("AAPL", "1d", now, interval="5m") is None
+    assert cache.get_stale("AAPL", "1d", now, interval="5m").data == {"price": 101}
+    assert cache.get_ttl("5m") == timedelta(minutes=1)
+    assert cache.get_retention("5m") == timedelta(minutes=3)
+    assert cache.get_retention("1d") == timedelta(minutes=65)
+
+    # Nach TTL + Retention wird nur der 5m-Eintrag verworfen
+    cache.purge_expired(now + timedelta(minutes=1))
+    assert cache.get_entry("AAPL", "5m") is None
+    assert cache.get_entry("AAPL").data == {"price": 100}
+
+    cache.clear_ticker("AAPL")
+    assert cache.stats()["entries"] == 0
+
+
+def test_TC_U_018_coarser_interval_derived_from_cached_daily_bars():
+    """Prüft, ob Wochenbars aus gecachten Tagesbars abgeleitet, gemerkt
+    und nach einer Aktualisierung der Tagesbars neu berechnet werden."""
+    import pandas as pd
+
+    cache = TickerCache(ttl_minutes=5)
+    now = datetime.now()
+    idx = pd.date_range(end=now, periods=60, freq="D").normalize()
+    daily = pd.DataFrame({"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 100}, index=idx)
+    cache.set_ticker("AAPL", daily, idx[0], now)
+
+    weekly = cache.get("AAPL", "1mo", now, interval="1wk")
+    assert weekly is not None and weekly.index.dayofweek.tolist() == [0] * len(weekly)
+    assert weekly["Volume"].iloc[1] == 700
+    assert weekly.attrs["summary"].matches(weekly)
+
+    # Gemerkt am Cache-Eintrag, solange sich die Tagesdaten nicht ändern
+    entry = cache.get_entry("AAPL")
+    assert entry.resample("1wk") is entry.resample("1wk")
+
+    # Neue Tagesdaten ersetzen den Eintrag und damit auch die abgeleiteten Wochenbars
+    cache.set_ticker("AAPL", daily.iloc[-2:].assign(Close=9.0), idx[-2], now)
+    assert cache.get("AAPL", "1mo", now, interval="1wk")["Close"].iloc[-1] == 9.0
+
+    # Ohne passende feinere Daten kein Treffer
+    assert cache.get("AAPL", "5y", now, interval="1wk") is None
+
+
+def test_TC_U_019_period_slice_anchored_on_last_session_on_weekends():
+    """Prüft, ob 1d/5d am Wochenende die letzten Handelstage liefern statt leerer oder gekürzter Daten."""
+    import pandas as pd
+
+    cache = TickerCache(ttl_minutes=5)
+    sunday = datetime(2025, 10, 19, 12, 0)
+    intraday = pd.date_range("2025-10-17 09:30", periods=78, freq="5min")   # Freitag
+    daily = pd.bdate_range(end="2025-10-17", periods=20)
+    cache.set_ticker("AAPL", pd.DataFrame({"Close": 1.0}, index=intraday), datetime(2025, 10, 17), sunday,
+                     interval="5m")
+    cache.set_ticker("AAPL", pd.DataFrame({"Close": 1.0}, index=daily), datetime(2025, 9, 1), sunday)
+
+    # Treffer am Sonntag: alle Bars vom Freitag bzw. die letzten 5 Handelstage (Mo-Fr)
+    assert len(cache.get("AAPL", "1d", sunday, interval="5m")) == 78
+    five_days = cache.get("AAPL", "5d", sunday)
+    assert len(five_days) == 5 and five_days.index[0] == pd.Timestamp("2025-10-13")
+
+
+def test_TC_U_020_store_concurrent_writes_use_own_temp_files(tmp_path):
+    """Prüft, ob gleichzeitige Schreibvorgänge desselben Tickers die Datei nicht beschädigen
+    und keine temporären Dateien hinterlassen."""
+    import threading
+    import pandas as pd
+    from utils import CacheEntry, TickerStore
+
+    pytest.importorskip("pyarrow")
+
+    store = TickerStore(str(tmp_path))
+    now = datetime(2025, 6, 30, 12, 0)
+    frames = [pd.DataFrame({"Close": [float(i)] * 2000}, index=pd.date_range(end="2025-06-30", periods=2000,
+                                                                             freq="D")) for i in range(8)]
+    threads = [threading.Thread(target=store.save, args=("AAPL", CacheEntry(df, df.index[0], now)))
+               for df in frames]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Genau eine vollständige Datei, keine temporären Dateien
+    entry = store.load("AAPL")
+    assert entry is not None and len(entry.data) == 2000 and entry.data["Close"].nunique() == 1
+    assert [p.name for p in tmp_path.iterdir()] == [os.path.basename(store.path("AAPL"))]
+
+
+def test_TC_U_021_compact_cache_keeps_float64_for_high_prices():
+    """Prüft, ob Kurse, deren Cent-Beträge float32 nicht exakt halten kann (z.B. BRK-A), unverändert zurückkommen."""
+    import numpy as np
+    import pandas as pd
+
+    now = datetime.now()
+    idx = pd.date_range(end=now, periods=2500, freq="D").normalize()
+    rng = np.random.default_rng(7)
+    high = np.round(700000 + rng.normal(0, 5000, 2500), 2)
+    low = np.round(np.linspace(100, 200, 2500), 2)
+    df = pd.DataFrame({"Close": high, "Open": low, "Volume": np.full(2500, 300, dtype=np.int64)}, index=idx)
+
+    compact = TickerCache(ttl_minutes=5, compact=True)
+    compact.set_ticker("BRK-A", df, datetime(2000, 1, 1), now)
+
+    # Nur die Spalte mit niedrigen Kursen wird verkleinert, alle Werte kommen exakt zurück
+    entry = compact.get_entry("BRK-A")
+    assert entry.data["Close"].dtype == np.float64
+    assert entry.data["Open"].dtype == np.float32
+    result = compact.get("BRK-A", "10y", now)
+    pd.testing.assert_frame_equal(result, df, check_freq=False)